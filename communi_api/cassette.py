@@ -0,0 +1,245 @@
+import base64
+import json
+import logging
+import logging.config
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+config_file = Path("logging_config.json")
+with config_file.open(encoding="utf-8") as f_in:
+    logging_config = json.load(f_in)
+    log_directory = Path(logging_config["handlers"]["file"]["filename"]).parent
+    if not log_directory.exists():
+        log_directory.mkdir(parents=True)
+    logging.config.dictConfig(config=logging_config)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMissError(requests.RequestException):
+    """Raised in replay mode if no recorded response matches a request."""
+
+
+def _encode_body(body: bytes | str | None) -> dict:
+    """Store a body as text if possible - base64 otherwise."""
+    if body is None:
+        return {}
+    if isinstance(body, str):
+        return {"body": body}
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_base64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(item: dict) -> bytes:
+    """Reverse of _encode_body."""
+    if "body_base64" in item:
+        return base64.b64decode(item["body_base64"])
+    return item.get("body", "").encode("utf-8")
+
+
+class Cassette:
+    """Records HTTP requests and responses to a file and replays them offline.
+
+    Responses are matched by method and url in recorded order.
+    Bodies are not compared by default because requests contain timestamps.
+
+    Usage:
+        cassette = Cassette("run.json", mode="record")
+        communi_api = CommuniApi(server, token, appid, cassette=cassette)
+        cassette.install(ct_api.session)
+        ...
+        cassette.save()
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        mode: str = REPLAY,
+        latency_scale: float = 1.0,
+        match_body: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Args:
+        path: cassette file
+        mode: "record" to capture real traffic or "replay" to serve it from the file
+        latency_scale: factor applied to recorded response times during replay,
+            0 replays without delay
+        match_body: also require identical request bodies during replay
+        """
+        if mode not in (RECORD, REPLAY):
+            msg = f"Unknown cassette mode {mode}"
+            raise ValueError(msg)
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.match_body = match_body
+        self.interactions = []
+        self._queues = defaultdict(deque)
+        self._lock = threading.Lock()
+
+        if mode == REPLAY:
+            with self.path.open(encoding="utf-8") as f_in:
+                self.interactions = json.load(f_in)["interactions"]
+            for interaction in self.interactions:
+                self._queues[self._key(interaction["request"])].append(interaction)
+            logger.info(
+                "Loaded %s interactions from %s", len(self.interactions), self.path
+            )
+
+    def __enter__(self) -> "Cassette":
+        """Use as context manager - recordings are saved on exit."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Save recordings."""
+        if self.mode == RECORD:
+            self.save()
+
+    def _key(self, request: dict) -> tuple:
+        """Key used to match requests during replay."""
+        key = (request["method"], request["url"])
+        if self.match_body:
+            key += (request.get("body"), request.get("body_base64"))
+        return key
+
+    def save(self) -> None:
+        """Write all recorded interactions to the cassette file."""
+        with self._lock, self.path.open("w", encoding="utf-8") as f_out:
+            json.dump(
+                {"interactions": self.interactions},
+                f_out,
+                ensure_ascii=False,
+                indent=1,
+            )
+        logger.info("Saved %s interactions to %s", len(self.interactions), self.path)
+
+    def adapter(self, **kwargs) -> "CassetteAdapter":
+        """Transport adapter which records or replays through this cassette.
+
+        Args:
+            kwargs: passed on to HTTPAdapter e.g. pool_maxsize
+        """
+        return CassetteAdapter(self, **kwargs)
+
+    def install(self, *sessions: requests.Session, **kwargs) -> None:
+        """Route all requests of the sessions through this cassette.
+
+        Args:
+            sessions: e.g. ChurchToolsApi.session
+            kwargs: passed on to HTTPAdapter e.g. pool_maxsize
+        """
+        adapter = self.adapter(**kwargs)
+        for session in sessions:
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+    @contextmanager
+    def activate(self):  # noqa: ANN201
+        """Route requests of all sessions through this cassette while active.
+
+        This includes sessions created within the block
+        e.g. the login when constructing a ChurchToolsApi.
+        """
+        adapter = self.adapter()
+        original_get_adapter = requests.Session.get_adapter
+        requests.Session.get_adapter = lambda _session, url: adapter  # noqa: ARG005
+        try:
+            yield self
+        finally:
+            requests.Session.get_adapter = original_get_adapter
+
+    def record(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+        elapsed: float,
+    ) -> None:
+        """Store one request and its response.
+
+        Args:
+            request: request sent to the server
+            response: response received
+            elapsed: seconds until the response was received - response.elapsed
+                is only set by requests after the adapter returned
+        """
+        interaction = {
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                **_encode_body(request.body),
+            },
+            "response": {
+                "status_code": response.status_code,
+                "reason": response.reason,
+                "headers": dict(response.headers),
+                "elapsed": elapsed,
+                **_encode_body(response.content),
+            },
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def play(self, request: requests.PreparedRequest) -> requests.Response:
+        """Create the recorded response for a request - waits the recorded time.
+
+        Raises:
+            CassetteMissError: if no matching recording is left
+        """
+        key = self._key(
+            {"method": request.method, "url": request.url, **_encode_body(request.body)}
+        )
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                msg = f"No recorded response for {request.method} {request.url}"
+                raise CassetteMissError(msg, request=request)
+            recorded = queue.popleft()["response"]
+
+        delay = recorded["elapsed"] * self.latency_scale
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=recorded["elapsed"])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = _decode_body(recorded)  # noqa: SLF001
+        response._content_consumed = True  # noqa: SLF001
+        return response
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter used by Cassette."""
+
+    def __init__(self, cassette: Cassette, **kwargs) -> None:
+        """Args:
+        cassette: cassette to record to or replay from
+        kwargs: passed on to HTTPAdapter
+        """
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):  # noqa: ANN001, ANN201
+        """Record a real response or replay a recorded one."""
+        if self.cassette.mode == REPLAY:
+            return self.cassette.play(request)
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
@@ -5,6 +5,11 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from communi_api.communiActions import get_create_or_delete_group
+from communi_api.group_registry import DEFAULT_GROUP_RETENTION
+from communi_api.membership import MembershipGraph
+from communi_api.profiling import profile_run, span
+from communi_api.roster import EventRoster, PersonRegistry
+from communi_api.rules import DEFAULT_RULES
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +22,19 @@ with config_file.open(encoding="utf-8") as f_in:
     logging.config.dictConfig(config=logging_config)
 
 
-def generate_group_name_for_event(ct_api, eventId):
+def generate_group_name_for_event(ct_api, eventId, event=None):
     """Method to generate communi group name for an event
     :param ct_api: link to ChurchTools
     :type ct_api: ChurchToolsApi
     :param eventId: number of the event to load
     :type eventId: int
+    :param event: optional event already loaded from ChurchTools to avoid another request
+    :type event: dict
     :return: group_name
     :rtype: str
     """
-    event = ct_api.get_events(eventId=eventId)[0]
+    if event is None:
+        event = ct_api.get_events(eventId=eventId)[0]
 
     date = datetime.strptime(event["startDate"], "%Y-%m-%dT%H:%M:%S%z")
     datestring = date.astimezone().strftime("%a %d.%m (%H:%M)")
@@ -38,67 +46,125 @@ def generate_group_name_for_event(ct_api, eventId):
     return group_name
 
 
-def are_services_relevant(eventServices):
+def are_services_relevant(eventServices, rules=DEFAULT_RULES):
     """Helper function which determines if the services for an event are considered relevant
-    At present this requires at least 1 service in Technik
+    By default this requires at least 1 service in Technik - see SyncRules to change this
     This depends on your ChurchTools Data!
     :param eventServices: result of generate_services_for_event function
     :type eventServices: dict
+    :param rules: rules used to decide on relevance
+    :type rules: SyncRules
     :return: if the set of event services should be considered relevant
     :rtype: bool
     """
-    if "Technik" in eventServices:
-        if len(eventServices["Technik"]) > 0:
-            return True
-    return False
+    return rules.is_relevant(eventServices)
 
 
-def generate_services_for_event(ct_api, eventId):
-    """Prepare the services variable used with Communi API for group automatisation
+def load_service_masterdata(ct_api):
+    """Load the service masterdata required to resolve eventServices
+    :param ct_api: link to ChurchTools
+    :type ct_api: ChurchToolsApi
+    :return: tuple of services and service groups - both as dict by ID
+    :rtype: tuple
+    """
+    with span("fetch masterdata", "churchtools"):
+        service_names = ct_api.get_services(returnAsDict=True)
+        serviceGroups = ct_api.get_event_masterdata(
+            resultClass="serviceGroups", returnAsDict=True
+        )
+    return service_names, serviceGroups
+
+
+def generate_event_roster(
+    ct_api, eventId, event=None, masterdata=None, person_cache=None
+):
+    """Prepare the compact roster of services and persons for one event
     :param ct_api: link to ChurchTools
     :type ct_api: ChurchToolsApi
     :param eventId: number of the event to load
     :type eventId: int
-    :return: eventServices as lists of names per dict of service per dict of servicegroup
-    :rtype: dict
+    :param event: optional event already loaded with include="eventServices"
+    :type event: dict
+    :param masterdata: optional result of load_service_masterdata to be reused
+    :type masterdata: tuple
+    :param person_cache: optional registry of persons shared between events - updated in place
+    :type person_cache: PersonRegistry
+    :return: roster which reads like the dict of generate_services_for_event
+    :rtype: EventRoster
     """
-    logger.info("Trying to get list of involved persons for next event")
-    event = ct_api.get_events(eventId=eventId, include="eventServices")[0]
-    service_names = ct_api.get_services(returnAsDict=True)
-
-    serviceGroups = ct_api.get_event_masterdata(resultClass="serviceGroups", returnAsDict=True)
-    eventServices = {item["name"]: {} for item in serviceGroups.values()}
+    logger.info("Trying to get list of involved persons for event %s", eventId)
+    if event is None:
+        event = ct_api.get_events(eventId=eventId, include="eventServices")[0]
+    if masterdata is None:
+        masterdata = load_service_masterdata(ct_api)
+    service_names, serviceGroups = masterdata
+    if person_cache is None:
+        person_cache = PersonRegistry()
+
+    roster = EventRoster(eventId, (item["name"] for item in serviceGroups.values()))
+
+    missing_person_ids = person_cache.missing(
+        service["personId"] for service in event["eventServices"]
+    )
+    if missing_person_ids:
+        with span("resolve persons", "churchtools", count=len(missing_person_ids)):
+            for personFromCT in ct_api.get_persons(ids=list(missing_person_ids)):
+                person_cache.add(personFromCT)
 
     for service in event["eventServices"]:
         service_name_item = service_names[service["serviceId"]]
-        service_name = service_name_item["name"]
         service_group_name = serviceGroups[service_name_item["serviceGroupId"]]["name"]
-        if service_name not in eventServices[service_group_name].keys():
-            eventServices[service_group_name][service_name] = []
-        if service["personId"] is not None:
-            personFromCT = ct_api.get_persons(ids=[service["personId"]])[0]
-            person = (
-                personFromCT["email"],
-                f"{'' if service['agreed'] else '?'} {personFromCT['firstName']} {personFromCT['lastName']}",
-            )
-            eventServices[service_group_name][service_name].append(person)
+        person = (
+            person_cache[service["personId"]]
+            if service["personId"] is not None
+            else None
+        )
+        roster.add(
+            service_group_name, service_name_item["name"], person, service["agreed"]
+        )
+
+    return roster
+
+
+def generate_services_for_event(
+    ct_api, eventId, event=None, masterdata=None, person_cache=None
+):
+    """Prepare the services variable used with Communi API for group automatisation
+    :param ct_api: link to ChurchTools
+    :type ct_api: ChurchToolsApi
+    :param eventId: number of the event to load
+    :type eventId: int
+    :param event: optional event already loaded with include="eventServices"
+    :type event: dict
+    :param masterdata: optional result of load_service_masterdata to be reused
+    :type masterdata: tuple
+    :param person_cache: optional registry of persons shared between events - updated in place
+    :type person_cache: PersonRegistry
+    :return: eventServices as lists of names per dict of service per dict of servicegroup
+    :rtype: dict
+    """
+    eventServices = generate_event_roster(
+        ct_api, eventId, event=event, masterdata=masterdata, person_cache=person_cache
+    ).to_dict()
 
     logger.debug("generate_services_for_event")
 
     return eventServices
 
 
-def get_x_day_event_ids(ct_api, reference_day=datetime.today(), number_of_days=7):
-    """Helper function that will get a list of event ids from CT based on reference day and number of days
+def get_x_day_events(ct_api, reference_day=None, number_of_days=7):
+    """Helper function that will get a list of events from CT based on reference day and number of days
     :param ct_api: link to ChurchTools
     :type ct_api: ChurchToolsApi
     :param number_of_days: number of days to take into consideration, by default 7 days, use negative numbers if needed
     :type number_of_days: int
-    :param reference_day: reference day for relative event search
+    :param reference_day: reference day for relative event search - today if not specified
     :type reference_day: datetime
-    :return: list of event ids from churchTools
+    :return: list of events from churchTools
     :rtype: list
     """
+    if reference_day is None:
+        reference_day = datetime.today()
     target_day = reference_day + timedelta(number_of_days)
 
     if reference_day < target_day:
@@ -108,33 +174,203 @@ def get_x_day_event_ids(ct_api, reference_day=datetime.today(), number_of_days=7
         from_date = target_day.astimezone().strftime("%Y-%m-%d")
         to_date = reference_day.astimezone().strftime("%Y-%m-%d")
 
-    events = ct_api.get_events(from_=from_date, to_=to_date)
-    event_ids = [event["id"] for event in events]
-    return event_ids
+    return ct_api.get_events(from_=from_date, to_=to_date)
+
+
+def get_x_day_event_ids(ct_api, reference_day=None, number_of_days=7):
+    """Helper function that will get a list of event ids from CT based on reference day and number of days
+    :param ct_api: link to ChurchTools
+    :type ct_api: ChurchToolsApi
+    :param number_of_days: number of days to take into consideration, by default 7 days, use negative numbers if needed
+    :type number_of_days: int
+    :param reference_day: reference day for relative event search - today if not specified
+    :type reference_day: datetime
+    :return: list of event ids from churchTools
+    :rtype: list
+    """
+    events = get_x_day_events(ct_api, reference_day, number_of_days)
+    return [event["id"] for event in events]
 
 
-def delete_event_chats(ct_api, communi_api, event_ids):
+def delete_event_chats(ct_api, communi_api, event_ids, registry=None):
     """Helper that deletes all groups that follow the automatic pattern for the last 14 days including today
+    Events found in the registry are deleted without loading them from ChurchTools
+    - see GroupRegistry.sweep to delete all expired groups instead
     :param ct_api: link to ChurchTools
     :type ct_api: ChurchToolsApi
     :param communi_api: link to Communi
     :type communi_api: CommuniApi
     :param event_ids: list of CT event IDs to take into account
     :type event_ids: list
+    :param registry: optional lifecycle registry of automatically created groups
+    :type registry: GroupRegistry
     :return: True if successful for all groups
     """
     result = True
 
     for event_id in event_ids:
-        group_name = generate_group_name_for_event(ct_api, event_id)
+        record = registry.by_event(event_id) if registry is not None else None
+        if record is not None:
+            group_name = record.group_name
+        else:
+            group_name = generate_group_name_for_event(ct_api, event_id)
         result |= (
-            get_create_or_delete_group(communi_api, group_name, delete=True) is not None
+            get_create_or_delete_group(
+                communi_api,
+                group_name,
+                delete=True,
+                registry=registry,
+                event_id=event_id,
+            )
+            is not None
         )
 
     return result
 
 
-def create_event_chats(ct_api, communi_api, event_ids, only_relevant=True):
+def plan_event_chats(  # noqa: PLR0913
+    ct_api,
+    event_ids,
+    only_relevant=True,
+    rules=DEFAULT_RULES,
+    person_cache=None,
+    masterdata=None,
+):
+    """Prepare group names and services for all events which need a chat
+    Relevance is decided from the service IDs of each event before any person is resolved,
+    persons and names are only loaded for events which pass
+    :param ct_api: link to ChurchTools
+    :type ct_api: ChurchToolsApi
+    :param event_ids: list of CT event IDs to take into account
+    :type event_ids: list
+    :param only_relevant: if true - filter for relevant groups is applied
+    :type only_relevant: bool
+    :param rules: relevance rules to apply
+    :type rules: SyncRules
+    :param person_cache: optional registry of persons shared between runs - updated in place
+    :type person_cache: PersonRegistry
+    :param masterdata: optional result of load_service_masterdata to be reused
+    :type masterdata: tuple
+    :return: list of plans - dicts with event_id, group_name, start_date, service_ids and services (EventRoster)
+    :rtype: list
+    """
+    if masterdata is None:
+        masterdata = load_service_masterdata(ct_api)
+    compiled_rules = rules.compile(*masterdata)
+    if person_cache is None:
+        person_cache = PersonRegistry()
+
+    plans = []
+    for event_id in event_ids:
+        with span("fetch event", "churchtools", event_id=event_id):
+            event = ct_api.get_events(eventId=event_id, include="eventServices")[0]
+        if only_relevant and not compiled_rules.is_event_relevant(event):
+            logger.debug("Skipping event %s - not relevant", event_id)
+            continue
+        services = generate_event_roster(
+            ct_api,
+            event_id,
+            event=event,
+            masterdata=masterdata,
+            person_cache=person_cache,
+        )
+        plans.append(
+            {
+                "event_id": event_id,
+                "group_name": generate_group_name_for_event(
+                    ct_api, event_id, event=event
+                ),
+                "start_date": event["startDate"],
+                "service_ids": sorted(
+                    {service["serviceId"] for service in event["eventServices"]}
+                ),
+                "services": services,
+            }
+        )
+
+    logger.info("Planned %s of %s events", len(plans), len(event_ids))
+    return plans
+
+
+def apply_event_plan(
+    communi_api, plan, rules=DEFAULT_RULES, registry=None, retention=None
+):
+    """Create or update the group of one planned event
+    :param communi_api: link to Communi
+    :type communi_api: CommuniApi
+    :param plan: one item of plan_event_chats
+    :type plan: dict
+    :param rules: exclusion and role rules to apply
+    :type rules: SyncRules
+    :param registry: optional lifecycle registry of automatically created groups
+    :type registry: GroupRegistry
+    :param retention: time after the event start until the group expires - DEFAULT_GROUP_RETENTION if not set
+    :type retention: timedelta
+    :return: if group is available
+    :rtype: bool
+    """
+    expires = None
+    if "start_date" in plan:
+        expires = datetime.strptime(plan["start_date"], "%Y-%m-%dT%H:%M:%S%z") + (
+            retention or DEFAULT_GROUP_RETENTION
+        )
+    with span("lookup group", event_id=plan["event_id"]):
+        group_id = get_create_or_delete_group(
+            communi_api,
+            plan["group_name"],
+            delete=False,
+            registry=registry,
+            event_id=plan["event_id"],
+            expires=expires,
+        )
+    if group_id is None:
+        logger.warning("No group available for event %s", plan["event_id"])
+        return False
+    with span("update group", event_id=plan["event_id"]):
+        update_group_users_by_services(communi_api, plan["services"], group_id, rules)
+    return group_id is not None
+
+
+def save_event_plans(plans, path):
+    """Save plans of plan_event_chats to a JSON file
+    :param plans: result of plan_event_chats
+    :type plans: list
+    :param path: target file
+    :type path: str | Path
+    """
+    with Path(path).open("w", encoding="utf-8") as f_out:
+        json.dump(
+            plans, f_out, ensure_ascii=False, indent=1, default=EventRoster.to_dict
+        )
+    logger.info("Saved %s plans to %s", len(plans), path)
+
+
+def load_event_plans(path):
+    """Load plans saved with save_event_plans
+    :param path: file to load
+    :type path: str | Path
+    :return: list of plans like plan_event_chats
+    :rtype: list
+    """
+    with Path(path).open(encoding="utf-8") as f_in:
+        plans = json.load(f_in)
+    for plan in plans:
+        for service_item in plan["services"].values():
+            for service_name, persons in service_item.items():
+                service_item[service_name] = [tuple(person) for person in persons]
+    return plans
+
+
+def create_event_chats(  # noqa: PLR0913
+    ct_api,
+    communi_api,
+    event_ids,
+    only_relevant=True,
+    rules=DEFAULT_RULES,
+    profile=None,
+    plan_file=None,
+    registry=None,
+):
     """Helper that create all groups for the respective event_ids
     :param ct_api: link to ChurchTools
     :type ct_api: ChurchToolsApi
@@ -144,48 +380,67 @@ def create_event_chats(ct_api, communi_api, event_ids, only_relevant=True):
     :type event_ids: list
     :param only_relevant: if true - filter for relevant groups is applied
     :type only_relevant: bool
+    :param rules: relevance, exclusion and role rules to apply
+    :type rules: SyncRules
+    :param profile: optional file to save a Chrome trace of this run - env COMMUNI_PROFILE is used if not set
+    :type profile: str
+    :param plan_file: optional file to save the plans before they are applied - see load_event_plans
+    :type plan_file: str
+    :param registry: optional lifecycle registry which records each group with its expiry
+    :type registry: GroupRegistry
     :return: True if successful for all groups
     """
     result = True
 
-    for event_id in event_ids:
-        services = generate_services_for_event(ct_api, event_id)
-        relevant = are_services_relevant(services)
-        if (relevant and only_relevant) or not only_relevant:
-            group_name = generate_group_name_for_event(ct_api, event_id)
-            group_id = get_create_or_delete_group(communi_api, group_name, delete=False)
-            result |= group_id is not None
-            update_group_users_by_services(communi_api, services, group_id)
+    with profile_run(profile):
+        with span("plan events", count=len(event_ids)):
+            plans = plan_event_chats(ct_api, event_ids, only_relevant, rules)
+        if plan_file:
+            save_event_plans(plans, plan_file)
+        for index, plan in enumerate(plans):
+            if not communi_api.is_available():
+                logger.warning(
+                    "Communi is not available - skipping remaining %s events",
+                    len(plans) - index,
+                )
+                return False
+            result |= apply_event_plan(communi_api, plan, rules, registry)
 
     return result
 
 
-def update_group_users_by_services(communi_api, event_services, groupId):
+def update_group_users_by_services(
+    communi_api, event_services, groupId, rules=DEFAULT_RULES
+):
     """:param communi_api: link to Communi
     :type communi_api: CommuniApi.CommuniApi
     :param event_services:
     :type event_services: dict
     :param groupId: Communi Group ID != CT Group or Event ID
     :type groupId: int
+    :param rules: exclusion and role rules to apply
+    :type rules: SyncRules
     :return:
     """
     timestamp = datetime.now().astimezone().strftime("%a %d.%m (%H:%M:%S)")
 
-    communi_users = communi_api.getUserList()
-    communi_users_ids = {item["mailadresse"]: item["id"] for item in communi_users}
+    with span("lookup users"):
+        communi_users = communi_api.getUserList() or []
+        communi_users_ids = {item["mailadresse"]: item["id"] for item in communi_users}
 
-    user_group_list = [
-        user["user"] for user in communi_api.getUserGroupList(group=groupId)
-    ]
-    new_group = len(user_group_list) == 1
+        memberships = MembershipGraph.from_user_group_list(
+            communi_api.getUserGroupList(group=groupId)
+        )
+    new_group = memberships.count(groupId) == 1
     if new_group:
         text = "Erstbefüllung der Gruppe mit Diensten"
     else:
         text = "Aktualisierung der Gruppe mit aktuellen Diensten"
 
-    communi_api.message(
-        groupId=groupId, text=f"AUTOMATISCHE Nachricht {timestamp}\n" + text
-    )
+    with span("messaging"):
+        communi_api.message(
+            groupId=groupId, text=f"AUTOMATISCHE Nachricht {timestamp}\n" + text
+        )
 
     for service_group_name, service_item in event_services.items():
         if len(service_item) == 0:  # Skip if empty Service Group
@@ -193,6 +448,8 @@ def update_group_users_by_services(communi_api, event_services, groupId):
         text = ""
         for service_name, service_persons in service_item.items():
             user_name_text = ""
+            excluded = rules.is_excluded(service_name, service_group_name)
+            role_id = rules.role_for(service_name)
             for user in service_persons:
                 mail = user[0]
                 name = user[1]
@@ -202,7 +459,7 @@ def update_group_users_by_services(communi_api, event_services, groupId):
                     name,
                     service_name,
                 )
-                if service_name in ["Begrüßung & Opferzählen", "Opfer zählen"]:
+                if excluded:
                     logger.debug(
                         "not adding User %s with mail %s because of service name",
                         name,
@@ -212,10 +469,14 @@ def update_group_users_by_services(communi_api, event_services, groupId):
                 elif mail in communi_users_ids:
                     communi_user_id = communi_users_ids[mail]
                     logger.debug("User %s found in communi", mail)
-                    if new_group or (communi_user_id not in user_group_list):
+                    if not memberships.is_member(communi_user_id, groupId):
                         logger.debug("User %s not found in group %s", mail, groupId)
                         user_name_text += f"\n• {name}"
-                        communi_api.changeUserGroup(communi_user_id, groupId, True)
+                        with span("membership writes"):
+                            communi_api.changeUserGroup(
+                                communi_user_id, groupId, True, role_id
+                            )
+                        memberships.add(communi_user_id, groupId)
                 else:
                     user_name_text += f"\n• {name} - FEHLT - (Mailadresse unbekannt)"
                     logger.debug(
@@ -226,9 +487,11 @@ def update_group_users_by_services(communi_api, event_services, groupId):
                 text += user_name_text
         if len(text) > 0:
             text = f"{service_group_name}:" + text
-            communi_api.message(groupId=groupId, text=text)
+            with span("messaging"):
+                communi_api.message(groupId=groupId, text=text)
 
     timestamp = datetime.now().astimezone().strftime("%a %d.%m (%H:%M:%S)")
-    communi_api.message(
-        groupId=groupId, text=f"ENDE AUTOMATISCHE Nachricht  um {timestamp}"
-    )
+    with span("messaging"):
+        communi_api.message(
+            groupId=groupId, text=f"ENDE AUTOMATISCHE Nachricht  um {timestamp}"
+        )
@@ -0,0 +1,65 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Stops requests to a failing backend for a cool-down period.
+
+    closed - requests pass, consecutive failures are counted
+    open - requests fail fast until reset_timeout has passed
+    half-open - a single probe request is let through,
+    its result either closes the circuit again or re-opens it
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        """Args:
+        failure_threshold: consecutive failures which open the circuit
+        reset_timeout: seconds to fail fast before a probe request is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        self._probe_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state of the circuit."""
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Check if a request may be sent - reserves the probe when half-open."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_running:
+                self._probe_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probe_running = False
+
+    def record_failure(self) -> None:
+        """Count a failed request - opens the circuit when the threshold is reached."""
+        with self._lock:
+            self.failures += 1
+            if self._probe_running or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_running = False
@@ -13,26 +13,108 @@ with config_file.open(encoding="utf-8") as f_in:
         log_directory.mkdir(parents=True)
     logging.config.dictConfig(config=logging_config)
 
-def get_create_or_delete_group(communi_api, group_name, delete=False):
+def _registered_group_id(communi_api, registry, event_id, delete, expires):
+    """Use or delete the group registered for an event - see get_create_or_delete_group
+    Registered groups which no longer exist in Communi are removed from the registry
+    so the group is looked up by name instead
+    :param communi_api: link to Communi
+    :type communi_api: CommuniApi
+    :param registry: lifecycle registry of automatically created groups
+    :type registry: GroupRegistry
+    :param event_id: CT event ID of the group
+    :type event_id: int
+    :param delete: bool whether the group should be deleted
+    :param expires: current expiry of the group
+    :type expires: datetime
+    :return: group ID, None if not registered (anymore), False if the group
+        could not be loaded or deleted
+    :rtype: int
+    """
+    record = registry.by_event(event_id)
+    if record is None:
+        return None
+    if delete:
+        result = communi_api.deleteGroup(id=record.group_id)
+        logger.debug("Deleted group %s was succesful = %s", record.group_id, result)
+        if result:
+            registry.remove(record.group_id)
+            return record.group_id
+
+    group = communi_api.find_group(id=record.group_id)
+    if group is False:
+        logger.warning(
+            "Groups could not be loaded - skipping group (%s)", record.group_name
+        )
+        return False
+    if group is None:
+        logger.info(
+            "Registered group %s of event %s no longer exists",
+            record.group_id,
+            event_id,
+        )
+        registry.remove(record.group_id)
+        return None
+    if delete:
+        logger.warning(
+            "Deleting group %s of event %s failed", record.group_id, event_id
+        )
+        return False
+    if record.expires != expires:
+        registry.register(record.group_id, event_id, record.group_name, expires)
+    return record.group_id
+
+
+def get_create_or_delete_group(  # noqa: C901, PLR0913
+    communi_api,
+    group_name,
+    delete=False,
+    registry=None,
+    event_id=None,
+    expires=None,
+):
     """Function to check if the group (by name) exists and return it's communi_id
     in case the name is not found the group will be created
+    If a registry and event_id are given the group is looked up by event first
+    and every found or created group is registered - registered groups which no longer
+    exist in Communi are dropped from the registry
     :param communi_api: link to Communi
     :type communi_api: CommuniApi
     :param group_name: formatted event name from CT used as prefix for group name
     :param delete: bool whether it should be deleted (and not created if not found)
+    :param registry: optional lifecycle registry of automatically created groups
+    :type registry: GroupRegistry
+    :param event_id: CT event ID of the group - required to use the registry
+    :type event_id: int
+    :param expires: time after which the group should be deleted by GroupRegistry.sweep
+    :type expires: datetime
     :return: group ID if successful, None if not available
     :rtype: int
     """
-    communi_groups = communi_api.getGroups()
-    for group in communi_groups:
-        if group["title"].startswith(group_name):
-            if delete:
-                result = communi_api.deleteGroup(id=group["id"])
-                logger.debug(
-                    "Deleted group %s was succesful = %s", group["id"], result
-                )
+    use_registry = registry is not None and event_id is not None
+    group_id = (
+        _registered_group_id(communi_api, registry, event_id, delete, expires)
+        if use_registry
+        else None
+    )
+    if group_id is False:
+        return None
+    if group_id is not None:
+        return group_id
+
+    group = communi_api.find_group(title_prefix=group_name)
+    if group is False:
+        logger.warning("Groups could not be loaded - skipping group (%s)", group_name)
+        return None
+    if group is not None:
+        if delete:
+            result = communi_api.deleteGroup(id=group["id"])
+            logger.debug("Deleted group %s was succesful = %s", group["id"], result)
+            if registry is not None and result:
+                registry.remove(group["id"])
+        elif use_registry:
+            registry.register(group["id"], event_id, group["title"], expires)
 
-            return group["id"]
+        return group["id"]
 
     if not delete:
         event_description = (
@@ -43,5 +125,9 @@ def get_create_or_delete_group(communi_api, group_name, delete=False):
             " - ACHTUNG - Wenige Tage nach Veranstaltung wird die Gruppe wieder gelöscht!"
         )
         newGroup = communi_api.createGroup(group_name, event_description, False, True)
+        if not newGroup:
+            return None
+        if use_registry:
+            registry.register(newGroup["id"], event_id, group_name, expires)
         return newGroup["id"]
     logger.info("Group (%s) not found therefore not deleted", group_name)
@@ -1,13 +1,28 @@
+import contextlib
+import hashlib
 import json
 import logging
 import logging.config
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from communi_api.circuit_breaker import CircuitBreaker
+from communi_api.profiling import span
+from communi_api.rate_limiter import RateLimiter
+from communi_api.snapshot import export_snapshot
+from communi_api.streaming import iter_json_array
 
 logger = logging.getLogger(__name__)
 
+STREAM_CHUNK_SIZE = 16384
+
 config_file = Path("logging_config.json")
 with config_file.open(encoding="utf-8") as f_in:
     logging_config = json.load(f_in)
@@ -18,21 +33,83 @@ with config_file.open(encoding="utf-8") as f_in:
 
 
 class CommuniApi:
-    """CommuniAPI class which can be used for all actions with Communi"""
-
-    def __init__(self, communi_server, communi_token, communi_appid):
+    """CommuniAPI class which can be used for all actions with Communi
+
+    Concurrency:
+    By default an instance uses one requests.Session and its attributes can be changed
+    (e.g. switching communi_appid) - use it from one thread at a time.
+    With thread_safe=True every thread gets its own session (each with a connection pool
+    of pool_size), the login is executed only once for all threads and
+    the connection config (communi_server, communi_token, communi_appid) is read-only.
+    Sessions of threads which ended are closed before a new thread gets its session.
+    All public methods can then be called concurrently e.g. from concurrent.futures workers.
+    Helpers which use workers themselves (publish_recommendations, export_snapshot,
+    load_membership_graph) do so through concurrent_client and are safe in both modes.
+    """
+
+    _immutable_config = ("communi_server", "communi_token", "communi_appid")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        communi_server,
+        communi_token,
+        communi_appid,
+        *,
+        lazy_login=False,
+        session_cache=None,
+        session_cache_ttl=3600,
+        thread_safe=False,
+        pool_size=10,
+        rate_limiter=None,
+        request_timeout=30,
+        failure_threshold=5,
+        reset_timeout=30,
+        cassette=None,
+    ):
         """Args:
         communi_token (str): security token used for access - see /page/integration/tab/rest within communi as admin
         communi_server (str): REST endpoint of the server https://api.communiapp.de/rest by default
         communi_appid (int): app ID of the communi instance to be used - see /page/integration/tab/rest within communi as admin
+        lazy_login (bool): if True login is postponed until the first request instead of being done on construction
+        session_cache (str | Path): optional file used to remember a validated login across instances and processes
+        session_cache_ttl (int): seconds a remembered login is considered valid - 1 hour by default
+        thread_safe (bool): use one session per thread and make the connection config read-only
+        pool_size (int): number of connections kept per session - should match the number of workers
+        rate_limiter (RateLimiter): optional limiter applied to all requests of this instance
+        request_timeout (float): seconds to wait for the server before a request fails
+        failure_threshold (int): consecutive failures of an endpoint before requests to it fail fast
+        reset_timeout (float): seconds an endpoint fails fast before a probe request is sent again
+        cassette (Cassette): optional cassette to record all requests to or replay them from
         """
         super().__init__()
         self.communi_server = communi_server
         self.communi_token = communi_token
         self.communi_appid = communi_appid
-
-        self.session = requests.Session()
-        self.login()
+        self.published_recommendations = set()
+        self.session_cache = Path(session_cache) if session_cache else None
+        self.session_cache_ttl = session_cache_ttl
+
+        self.thread_safe = thread_safe
+        self.pool_size = pool_size
+        self.rate_limiter = rate_limiter
+        self.request_timeout = request_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.cassette = cassette
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+        self._login_lock = threading.RLock()
+        self._login_result = None
+        self._in_login = threading.local()
+        self._sessions_lock = threading.Lock()
+        self._sessions = {}
+        self._thread_local = threading.local()
+
+        self.session = self._new_session()
+        self._frozen = thread_safe
+        if not lazy_login:
+            self.login()
 
         logger.debug("Instance initialized")
 
@@ -43,21 +120,200 @@ class CommuniApi:
         text = f"This is a Communi API instance connected to {self.communi_server} with CommuniApp {self.communi_appid}"
         return text
 
+    def __setattr__(self, name, value):
+        """Prevent changes of the connection config in thread_safe mode"""
+        if name in self._immutable_config and getattr(self, "_frozen", False):
+            msg = f"{name} can not be changed on a thread safe CommuniApi instance"
+            raise AttributeError(msg)
+        super().__setattr__(name, value)
+
+    def _new_session(self):
+        """Create a session with a connection pool sized for pool_size concurrent requests
+        :return: new session with authorization header
+        """
+        session = requests.Session()
+        if self.cassette is not None:
+            self.cassette.install(
+                session, pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+        else:
+            adapter = HTTPAdapter(
+                pool_connections=self.pool_size, pool_maxsize=self.pool_size
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        session.headers["X-Authorization"] = "Bearer " + self.communi_token
+        with self._sessions_lock:
+            self._sessions[threading.current_thread()] = session
+        return session
+
+    def _release_finished_sessions(self):
+        """Close the sessions of threads which ended - only used in thread_safe mode
+        Without this every new worker thread would keep its session and connections
+        until close() is called
+        """
+        with self._sessions_lock:
+            finished = [thread for thread in self._sessions if not thread.is_alive()]
+            sessions = [self._sessions.pop(thread) for thread in finished]
+        for session in sessions:
+            session.close()
+        if sessions:
+            logger.debug("Closed %s sessions of finished threads", len(sessions))
+
+    @property
+    def session(self):
+        """Session used for requests of the current thread
+        :return: requests.Session
+        """
+        if not self.thread_safe:
+            return self._session
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            self._release_finished_sessions()
+            session = self._new_session()
+            self._thread_local.session = session
+        return session
+
+    @session.setter
+    def session(self, session):
+        if self.thread_safe:
+            self._thread_local.session = session
+        else:
+            self._session = session
+
+    def close(self):
+        """Close the sessions of all threads"""
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+        self._thread_local = threading.local()
+
+    @contextlib.contextmanager
+    def concurrent_client(self, pool_size=None):
+        """Instance which may be used from several threads at once
+        This is the instance itself if thread_safe - sessions of threads which ended
+        in the meantime are closed afterwards, otherwise a thread safe copy
+        which shares login and circuit breakers and is closed afterwards
+        :param pool_size: connections per session of the copy - pool_size by default
+        :return: context manager yielding a thread safe CommuniApi
+        """
+        if self.thread_safe:
+            try:
+                yield self
+            finally:
+                self._release_finished_sessions()
+            return
+
+        self._ensure_login()
+        client = CommuniApi(
+            self.communi_server,
+            self.communi_token,
+            self.communi_appid,
+            lazy_login=True,
+            session_cache=self.session_cache,
+            session_cache_ttl=self.session_cache_ttl,
+            thread_safe=True,
+            pool_size=pool_size or self.pool_size,
+            rate_limiter=self.rate_limiter,
+            request_timeout=self.request_timeout,
+            failure_threshold=self.failure_threshold,
+            reset_timeout=self.reset_timeout,
+            cassette=self.cassette,
+        )
+        client._login_result = self._login_result
+        if hasattr(self, "user_id"):
+            client.user_id = self.user_id
+        client._breakers = self._breakers
+        client._breakers_lock = self._breakers_lock
+        try:
+            yield client
+        finally:
+            client.close()
+
+    def _session_cache_key(self):
+        """Key used for the session cache - the token itself is only stored as hash
+        :return: cache key for current server, app and token
+        """
+        token_hash = hashlib.sha256(self.communi_token.encode()).hexdigest()
+        return f"{self.communi_server}|{self.communi_appid}|{token_hash}"
+
+    def _read_session_cache(self):
+        """Read all entries of the session cache file
+        :return: dict of cache entries - empty if not available
+        """
+        if self.session_cache is None or not self.session_cache.exists():
+            return {}
+        try:
+            with self.session_cache.open(encoding="utf-8") as f_in:
+                return json.load(f_in)
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Ignoring unreadable session cache %s", self.session_cache)
+            return {}
+
+    def _write_session_cache(self, login_content):
+        """Remember a validated login in the session cache file
+        Each writer uses its own temporary file so concurrent processes do not collide,
+        failures are only logged because the cache is an optimization
+        :param login_content: response content of a successful login
+        """
+        if self.session_cache is None:
+            return
+        now = time.time()
+        entries = {
+            key: value
+            for key, value in self._read_session_cache().items()
+            if value["expires"] > now
+        }
+        entries[self._session_cache_key()] = {
+            "login": login_content,
+            "expires": now + self.session_cache_ttl,
+        }
+        try:
+            replace_json_file(self.session_cache, entries)
+        except OSError:
+            logger.warning(
+                "Could not write session cache %s", self.session_cache, exc_info=True
+            )
+
     def login(self):
         """Method used for login (with token, server stored in instance)
+        A still valid entry in the session cache is used instead of requesting the server
+        Until a login succeeded requests of other threads wait for it and
+        requests after a failed login try to login again
+        :return:  either response content or False if unsucessful
+        """
+        with self._login_lock:
+            # requests done during login must not start another login
+            self._in_login.active = True
+            try:
+                self._login_result = self._login() or None
+            finally:
+                self._in_login.active = False
+            return self._login_result or False
+
+    def _login(self):
+        """Login without guarding against concurrent or nested logins - see login
         :return:  either response content or False if unsucessful
         """
-        url = self.communi_server + "/login"
         self.session.headers["X-Authorization"] = "Bearer " + self.communi_token
 
-        response = self.session.get(url=url)
+        cached = self._read_session_cache().get(self._session_cache_key())
+        if cached and cached["expires"] > time.time():
+            self.user_id = cached["login"]["id"]
+            logger.debug("Login with user ID:%s - from session cache", self.user_id)
+            return cached["login"]
+
+        url = self.communi_server + "/login"
+        response = self._send("GET", url)
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
             self.user_id = response_content["id"]
             logger.debug("Login with user ID:%s - success", self.user_id)
 
-            groups = self.getGroups()
-            if groups:
+            # any group proves the App-ID - stop reading after the first one
+            if self.find_group():
+                self._write_session_cache(response_content)
                 return response_content
             logger.warning(
                 "Login with App-ID:%s did not return groups - either APP-ID wrong or empty app",
@@ -69,12 +325,109 @@ class CommuniApi:
         logger.debug("Login failed with %s", response.content)
         return False
 
+    def _ensure_login(self):
+        """Execute the login if it was postponed by lazy_login or did not succeed yet"""
+        if self._login_result is None and not getattr(self._in_login, "active", False):
+            with self._login_lock:
+                if self._login_result is None:
+                    self.login()
+
+    def _request(self, method, url, **kwargs):
+        """Send a request using the session of this instance - logs in first if required
+        :param method: HTTP method e.g. GET
+        :param url: full url to request
+        :param kwargs: passed on to requests
+        :return: response of the request
+        """
+        self._ensure_login()
+        return self._send(method, url, **kwargs)
+
+    def _endpoint(self, url):
+        """Name of the endpoint used to group requests for circuit breaking
+        :param url: full url of the request
+        :return: first path element after the server e.g. group or UserGroup
+        """
+        return url.removeprefix(self.communi_server).strip("/").split("/")[0]
+
+    def circuit_breaker(self, endpoint):
+        """Get the circuit breaker of an endpoint
+        :param endpoint: first path element after the server e.g. group or UserGroup
+        :return: CircuitBreaker
+        """
+        with self._breakers_lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return self._breakers[endpoint]
+
+    def is_available(self, endpoint=None):
+        """Check if requests are currently sent or failing fast because of previous errors
+        :param endpoint: optional endpoint to check - all endpoints if not specified
+        :return: False if the circuit of the endpoint (or any endpoint) is open
+        """
+        if endpoint is not None:
+            return self.circuit_breaker(endpoint).state != CircuitBreaker.OPEN
+        with self._breakers_lock:
+            breakers = list(self._breakers.values())
+        return all(breaker.state != CircuitBreaker.OPEN for breaker in breakers)
+
+    def _failed_response(self, url, reason):
+        """Response used instead of raising if no answer was received from the server
+        :param url: url of the request
+        :param reason: text included in the error content
+        :return: requests.Response with status 503
+        """
+        response = requests.Response()
+        response.status_code = requests.codes.service_unavailable
+        response.url = url
+        response._content = json.dumps({"error": reason}).encode()  # noqa: SLF001
+        response._content_consumed = True  # noqa: SLF001
+        return response
+
+    def _send(self, method, url, **kwargs):
+        """Send a request guarded by the circuit breaker of its endpoint
+        Connection problems and server errors are counted as failures,
+        while the circuit is open a 503 response is returned without contacting the server
+        :param method: HTTP method e.g. GET
+        :param url: full url to request
+        :param kwargs: passed on to requests
+        :return: response of the request
+        """
+        endpoint = self._endpoint(url)
+        breaker = self.circuit_breaker(endpoint)
+        if not breaker.allow_request():
+            logger.debug("Skipping %s %s - circuit of %s is open", method, url, endpoint)
+            return self._failed_response(url, "circuit open")
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        kwargs.setdefault("timeout", self.request_timeout)
+        try:
+            with span(f"{method} {url.removeprefix(self.communi_server)}", "communi"):
+                response = self.session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as error:
+            logger.warning("%s %s failed with %s", method, url, error)
+            response = self._failed_response(url, str(error))
+
+        if response.status_code < requests.codes.server_error:
+            breaker.record_success()
+            return response
+
+        breaker.record_failure()
+        if breaker.state == CircuitBreaker.OPEN:
+            logger.warning(
+                "Circuit of %s opened after %s failures", endpoint, breaker.failures
+            )
+        return response
+
     def who_am_i(self):
         """Method to request user information associated with the logged in user (id stored upon successful login)
         This can be used to test if the user is authorized
 
         :return: dict of user OR bool False if not successful
         """
+        self._ensure_login()
         if not hasattr(self, "user_id"):
             return False
         return self.getUserList(userId=self.user_id)
@@ -90,7 +443,7 @@ class CommuniApi:
         if "userId" in kwargs:
             params["id"] = kwargs["userId"]
 
-        response = self.session.get(url=url, params=params)
+        response = self._request("GET", url=url, params=params)
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
             logger.debug("Fetched %s users successful", len(response_content))
@@ -117,7 +470,7 @@ class CommuniApi:
         if "user" in kwargs:
             params["user"] = kwargs["user"]
 
-        response = self.session.get(url=url, params=params)
+        response = self._request("GET", url=url, params=params)
 
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
@@ -153,7 +506,7 @@ class CommuniApi:
             "communiApp": self.communi_appid,
         }
 
-        response = self.session.post(url=url, json=data)
+        response = self._request("POST", url=url, json=data)
 
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
@@ -177,7 +530,7 @@ class CommuniApi:
         if "id" in kwargs:
             params["id"] = kwargs["id"]
 
-        response = self.session.get(url=url, params=params)
+        response = self._request("GET", url=url, params=params)
 
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
@@ -198,6 +551,92 @@ class CommuniApi:
         logger.debug("Requesting group failed with %s", response.content)
         return False
 
+    def _stream_list(self, url, params):
+        """Request a list response as stream
+        :param url: full url to request
+        :param params: query parameters
+        :return: response to be read with iter_json_array or None if the request failed
+        """
+        response = self._request("GET", url=url, params=params, stream=True)
+        if response.status_code == requests.codes.ok:
+            return response
+        logger.debug("Streaming %s failed with %s", url, response.content)
+        response.close()
+        return None
+
+    def _stream_groups(self, **kwargs):
+        """Request groups as stream - see iter_groups for kwargs
+        :return: tuple of response (None if failed) and generator of matching groups
+        """
+        url = self.communi_server + "/group"
+        params = {"loadStatus": True, "communiApp": self.communi_appid}
+        if "id" in kwargs:
+            params["id"] = kwargs["id"]
+
+        response = self._stream_list(url, params)
+        if response is None:
+            return None, iter(())
+        groups = (
+            group
+            for group in iter_json_array(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            )
+            if ("name" not in kwargs or group["title"] == kwargs["name"])
+            and (
+                "title_prefix" not in kwargs
+                or group["title"].startswith(kwargs["title_prefix"])
+            )
+        )
+        return response, groups
+
+    def iter_groups(self, **kwargs):
+        """Streaming version of getGroups which yields matching groups one by one
+        Stop iterating early to skip the rest of the response
+        :param kwargs:
+        :keyword id: get only group with matching id
+        :keyword name: get only groups with matching name
+        :keyword title_prefix: get only groups with a title starting with this text
+        :return: generator of groups - empty if the request failed
+        """
+        response, groups = self._stream_groups(**kwargs)
+        if response is None:
+            return
+        with contextlib.closing(response):
+            yield from groups
+
+    def find_group(self, **kwargs):
+        """Get the first group matching the filter - the response is not read any further
+        :param kwargs: same as iter_groups
+        :return: group, None if not found or False if the groups could not be requested
+        """
+        response, groups = self._stream_groups(**kwargs)
+        if response is None:
+            return False
+        with contextlib.closing(response):
+            return next(groups, None)
+
+    def iter_user_group_list(self, **kwargs):
+        """Streaming version of getUserGroupList which yields allocations one by one
+        :param kwargs:
+        :keyword group: group ID for filter
+        :keyword user: user ID for filter
+        :return: generator of UserGroup allocations - empty if the request failed
+        """
+        url = self.communi_server + "/UserGroup"
+        params = {"loadStatus": True, "communiApp": self.communi_appid}
+        if "group" in kwargs:
+            params["group"] = kwargs["group"]
+        if "user" in kwargs:
+            params["user"] = kwargs["user"]
+
+        response = self._stream_list(url, params)
+        if response is None:
+            return
+        with contextlib.closing(response):
+            yield from iter_json_array(
+                response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            )
+
     def deleteGroup(self, **kwargs):
         """Delete a groups matching keyword specified criteria
         :param kwargs: id = groupID (primary filter) OR name = groupName (without
@@ -216,7 +655,7 @@ class CommuniApi:
 
         url = self.communi_server + "/group/" + str(id)
 
-        response = self.session.delete(url)
+        response = self._request("DELETE", url)
 
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
@@ -227,19 +666,20 @@ class CommuniApi:
             logger.debug("Deleting group failed with %s", response.content)
             return False
 
-    def changeUserGroup(self, userId, groupId, add_user=True):
+    def changeUserGroup(self, userId, groupId, add_user=True, role_id=40):
         """Function to add or remove a user from a group
         Be aware that there might be a few seconds delay before changes are reflected in the app
 
         :param userId: user specific id
         :param groupId: group specific id- either from get groups or e.g. from groups detail page
         :param add_user: boolean if user should be added (or removed if false)
+        :param role_id: communi role of the user within the group - 40 (member) by default
         :return: ???
         """
         url = self.communi_server + f"/UserGroup/{userId}-{groupId}"
 
         data = {
-            "roleId": 40,
+            "roleId": role_id,
             "createdOn": str(datetime.now()),
             "status": 2 if add_user else 4,
             "user": userId,
@@ -250,7 +690,7 @@ class CommuniApi:
             "valid": True,
         }
 
-        response = self.session.put(url, json=data)
+        response = self._request("PUT", url, json=data)
 
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
@@ -280,7 +720,7 @@ class CommuniApi:
 
         data = {"message": text, "conversation": f"group-{groupId}"}
 
-        response = self.session.post(url, json=data)
+        response = self._request("POST", url, json=data)
 
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
@@ -317,21 +757,29 @@ class CommuniApi:
         Returns:
             if successful
         """
-        url = self.communi_server + "/recommendation"
-
         data = {
             "title": title,
-            "dateTime": post_date.strftime("%Y-%m-%d %H:%M:%S %z").replace(
-                "+0000", "+0"
-            ),
+            "dateTime": format_recommendation_date(post_date),
             "description": description,
             "picUrl": pic_url,
             "link": link,
             "group": f"{group_id}",
             "isOfficial": is_official,
         }
+        return self._post_recommendation(data)
+
+    def _post_recommendation(self, data: dict) -> bool:
+        """Post a prepared recommendation payload.
+
+        Args:
+            data: request body as generated by recommendation()
+
+        Returns:
+            if successful
+        """
+        url = self.communi_server + "/recommendation"
 
-        response = self.session.post(url, json=data)
+        response = self._request("POST", url, json=data)
 
         if response.status_code == requests.codes.ok:
             response_content = json.loads(response.content)
@@ -340,3 +788,195 @@ class CommuniApi:
                 return response_content["valid"]
         logger.debug("Posting message %s failed with %s", data, response.content)
         return False
+
+    def publish_recommendations(
+        self,
+        items: list[dict],
+        groups: list[int],
+        max_workers: int = 8,
+        requests_per_second: float = 5.0,
+        published_file: str | Path | None = None,
+    ) -> list[dict]:
+        """Post several recommendations into several groups at once.
+
+        Requests are executed concurrently but limited to requests_per_second.
+        Identical (group, link) pairs are only posted once - this includes pairs
+        which were already published successfully by this instance before.
+        Recommendations already in Communi are not looked up - pairs posted by
+        other instances or processes are only skipped if they share a published_file.
+
+        Args:
+            items: list of recommendations - each a dict with keys
+                title, description, post_date and optional pic_url, link, is_official
+            groups: list of group IDs to post every item into
+            max_workers: number of concurrent requests. Defaults to 8.
+            requests_per_second: rate limit for all requests. Defaults to 5.0.
+            published_file: optional JSON file which keeps the published
+                (group, link) pairs across runs - read before and updated after posting
+
+        Returns:
+            one result row per (group, item) combination with keys
+            group_id, title, link and status (posted, skipped or failed)
+        """
+        rate_limiter = RateLimiter(requests_per_second)
+        results = []
+        jobs = []
+        published_file = Path(published_file) if published_file else None
+        if published_file is not None:
+            self.published_recommendations |= _read_published_file(published_file)
+        seen = set(self.published_recommendations)
+
+        # date formatting is done once per item instead of once per target
+        payloads = [
+            {
+                "title": item["title"],
+                "dateTime": format_recommendation_date(item["post_date"]),
+                "description": item["description"],
+                "picUrl": item.get("pic_url", ""),
+                "link": item.get("link", ""),
+                "isOfficial": item.get("is_official", False),
+            }
+            for item in items
+        ]
+
+        for group_id in groups:
+            for payload in payloads:
+                row = {
+                    "group_id": group_id,
+                    "title": payload["title"],
+                    "link": payload["link"],
+                    "status": "skipped",
+                }
+                results.append(row)
+                key = (group_id, payload["link"])
+                if payload["link"] and key in seen:
+                    logger.debug("Skipping already published recommendation %s", key)
+                    continue
+                seen.add(key)
+                jobs.append((row, {**payload, "group": f"{group_id}"}))
+
+        with (
+            self.concurrent_client(max_workers) as client,
+            ThreadPoolExecutor(max_workers=max_workers) as executor,
+        ):
+
+            def post(data: dict) -> bool:
+                rate_limiter.acquire()
+                return client._post_recommendation(data)  # noqa: SLF001
+
+            futures = {executor.submit(post, data): row for row, data in jobs}
+            for future in as_completed(futures):
+                row = futures[future]
+                try:
+                    success = future.result()
+                except (requests.RequestException, ValueError):
+                    # ValueError includes invalid JSON in the reply of one target
+                    logger.exception("Publishing recommendation %s failed", row)
+                    success = False
+                row["status"] = "posted" if success else "failed"
+                if success and row["link"]:
+                    self.published_recommendations.add((row["group_id"], row["link"]))
+
+        if published_file is not None:
+            _write_published_file(published_file, self.published_recommendations)
+
+        logger.debug(
+            "Published %s of %s recommendations",
+            sum(row["status"] == "posted" for row in results),
+            len(results),
+        )
+        return results
+
+    def export_snapshot(self, path: str | Path, max_workers: int = 8) -> dict:
+        """Save users, groups and all memberships of the app into a local file.
+
+        The file can be loaded with snapshot.OfflineCommuniApi
+        for read-only access without any further API calls.
+
+        Args:
+            path: target file - use suffix .gz for compression
+            max_workers: number of concurrent requests. Defaults to 8.
+
+        Returns:
+            number of records saved per type
+        """
+        return export_snapshot(self, path, max_workers=max_workers)
+
+
+def replace_json_file(path: Path, content: object) -> None:
+    """Replace a JSON file through a unique temporary file.
+
+    Each writer uses its own temporary file so concurrent threads and processes
+    do not collide - the last writer wins.
+
+    Args:
+        path: file to be replaced
+        content: JSON compatible content
+
+    Raises:
+        OSError: if the file could not be written - the temporary file is removed
+    """
+    temp_file = None
+    try:
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=path.parent,
+            prefix=path.name,
+            suffix=".tmp",
+            delete=False,
+        ) as f_out:
+            temp_file = Path(f_out.name)
+            json.dump(content, f_out)
+        temp_file.replace(path)
+    except OSError:
+        if temp_file is not None:
+            temp_file.unlink(missing_ok=True)
+        raise
+
+
+def _read_published_file(path: Path) -> set[tuple[int, str]]:
+    """Read (group, link) pairs written by _write_published_file.
+
+    Args:
+        path: JSON file - empty if it does not exist or can not be read
+
+    Returns:
+        published (group, link) pairs
+    """
+    if not path.exists():
+        return set()
+    try:
+        with path.open(encoding="utf-8") as f_in:
+            return {(group_id, link) for group_id, link in json.load(f_in)}
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable published recommendations %s", path)
+        return set()
+
+
+def _write_published_file(path: Path, published: set[tuple[int, str]]) -> None:
+    """Add (group, link) pairs to the file - pairs written meanwhile are kept.
+
+    Args:
+        path: JSON file with a list of [group, link] pairs
+        published: pairs published successfully
+    """
+    pairs = _read_published_file(path) | published
+    try:
+        replace_json_file(path, sorted(pairs))
+    except OSError:
+        logger.warning(
+            "Could not write published recommendations %s", path, exc_info=True
+        )
+
+
+def format_recommendation_date(post_date: datetime) -> str:
+    """Format a datetime the way the recommendation endpoint expects it.
+
+    Args:
+        post_date: date to be formatted
+
+    Returns:
+        formatted date string
+    """
+    return post_date.strftime("%Y-%m-%d %H:%M:%S %z").replace("+0000", "+0")
@@ -0,0 +1,228 @@
+import json
+import logging
+import logging.config
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+config_file = Path("logging_config.json")
+with config_file.open(encoding="utf-8") as f_in:
+    logging_config = json.load(f_in)
+    log_directory = Path(logging_config["handlers"]["file"]["filename"]).parent
+    if not log_directory.exists():
+        log_directory.mkdir(parents=True)
+    logging.config.dictConfig(config=logging_config)
+
+DEFAULT_GROUP_RETENTION = timedelta(days=3)
+
+
+@dataclass(frozen=True)
+class GroupRecord:
+    """Lifecycle metadata of one automatically created Communi group."""
+
+    group_id: int
+    event_id: int
+    group_name: str
+    created: datetime
+    expires: datetime | None = None
+
+    def is_expired(self, now: datetime) -> bool:
+        """Check if the group should be deleted at the given time."""
+        return self.expires is not None and self.expires <= now
+
+    def to_dict(self) -> dict:
+        """JSON compatible representation."""
+        return asdict(self) | {
+            "created": self.created.isoformat(),
+            "expires": self.expires.isoformat() if self.expires else None,
+        }
+
+    @classmethod
+    def from_dict(cls, item: dict) -> "GroupRecord":
+        """Reverse of to_dict."""
+        return cls(
+            group_id=item["group_id"],
+            event_id=item["event_id"],
+            group_name=item["group_name"],
+            created=datetime.fromisoformat(item["created"]),
+            expires=datetime.fromisoformat(item["expires"])
+            if item["expires"]
+            else None,
+        )
+
+
+class GroupRegistry:
+    """Local store of automatically created groups by Communi group and CT event ID.
+
+    Groups are found by event without listing all groups of the app
+    and expired groups are selected without regenerating names from ChurchTools.
+    Use one registry file per Communi app.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        """Args:
+        path: JSON file used to persist the registry - kept in memory only if None
+        """
+        self.path = Path(path) if path is not None else None
+        self._by_group = {}
+        self._by_event = {}
+        self._lock = threading.Lock()
+
+        if self.path is not None and self.path.exists():
+            with self.path.open(encoding="utf-8") as f_in:
+                for item in json.load(f_in):
+                    self._add(GroupRecord.from_dict(item))
+            logger.debug("Loaded %s groups from %s", len(self), self.path)
+
+    def __len__(self) -> int:
+        """Number of registered groups."""
+        return len(self._by_group)
+
+    def __iter__(self):  # noqa: ANN204
+        """Iterate over a snapshot of all records."""
+        with self._lock:
+            return iter(list(self._by_group.values()))
+
+    def _add(self, record: GroupRecord) -> None:
+        """Index a record - replaces records with the same group or event."""
+        self._remove(record.group_id)
+        previous = self._by_event.get(record.event_id)
+        if previous is not None:
+            self._remove(previous.group_id)
+        self._by_group[record.group_id] = record
+        self._by_event[record.event_id] = record
+
+    def _remove(self, group_id: int) -> GroupRecord | None:
+        """Drop a record from all indexes."""
+        record = self._by_group.pop(group_id, None)
+        if record is not None and self._by_event.get(record.event_id) is record:
+            del self._by_event[record.event_id]
+        return record
+
+    def _save(self) -> None:
+        """Write all records to the registry file - caller holds the lock.
+
+        Each writer uses its own temporary file so several processes sharing the
+        file do not collide. Failures are only logged - the records stay in memory
+        and the groups they describe already exist in Communi.
+        """
+        if self.path is None:
+            return
+        temp_file = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=self.path.parent,
+                prefix=self.path.name,
+                suffix=".tmp",
+                delete=False,
+            ) as f_out:
+                temp_file = Path(f_out.name)
+                json.dump(
+                    [record.to_dict() for record in self._by_group.values()],
+                    f_out,
+                    ensure_ascii=False,
+                    indent=1,
+                )
+            temp_file.replace(self.path)
+        except OSError:
+            logger.warning("Could not save group registry %s", self.path, exc_info=True)
+            if temp_file is not None:
+                temp_file.unlink(missing_ok=True)
+
+    def register(
+        self,
+        group_id: int,
+        event_id: int,
+        group_name: str,
+        expires: datetime | None = None,
+    ) -> GroupRecord:
+        """Remember a group created or found for an event.
+
+        The creation time of an already registered group is kept.
+
+        Args:
+            group_id: Communi group ID
+            event_id: ChurchTools event ID
+            group_name: title of the group
+            expires: time after which the group should be deleted - never if None
+
+        Returns:
+            the stored record
+        """
+        with self._lock:
+            existing = self._by_group.get(group_id)
+            record = GroupRecord(
+                group_id=group_id,
+                event_id=event_id,
+                group_name=group_name,
+                created=existing.created
+                if existing
+                else datetime.now().astimezone(),
+                expires=expires,
+            )
+            if record != existing:
+                self._add(record)
+                self._save()
+        return record
+
+    def by_event(self, event_id: int) -> GroupRecord | None:
+        """Record of the group for a ChurchTools event."""
+        return self._by_event.get(event_id)
+
+    def by_group(self, group_id: int) -> GroupRecord | None:
+        """Record of a Communi group."""
+        return self._by_group.get(group_id)
+
+    def remove(self, group_id: int) -> GroupRecord | None:
+        """Forget a group e.g. after it was deleted - returns the removed record."""
+        with self._lock:
+            record = self._remove(group_id)
+            if record is not None:
+                self._save()
+        return record
+
+    def expired(self, now: datetime | None = None) -> list[GroupRecord]:
+        """All records which expired at the given time - defaults to now."""
+        now = now or datetime.now().astimezone()
+        with self._lock:
+            return [
+                record for record in self._by_group.values() if record.is_expired(now)
+            ]
+
+    def sweep(self, communi_api, now: datetime | None = None) -> dict[int, bool]:  # noqa: ANN001
+        """Delete all expired groups from Communi in one pass.
+
+        Records are only removed if the group was deleted successfully.
+
+        Args:
+            communi_api: link to Communi
+            now: reference time - defaults to now
+
+        Returns:
+            success per Communi group ID
+        """
+        results = {}
+        for record in self.expired(now):
+            results[record.group_id] = bool(communi_api.deleteGroup(id=record.group_id))
+            logger.debug(
+                "Deleted expired group %s of event %s was successful = %s",
+                record.group_id,
+                record.event_id,
+                results[record.group_id],
+            )
+        with self._lock:
+            for group_id, success in results.items():
+                if success:
+                    self._remove(group_id)
+            if any(results.values()):
+                self._save()
+        logger.info(
+            "Swept %s of %s expired groups", sum(results.values()), len(results)
+        )
+        return results
@@ -0,0 +1,468 @@
+"""Load test for CommuniApi against a local Communi stand-in server.
+
+Usage:
+    python -m communi_api.loadtest --tenants 1 2 4 8 --operations 200
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import logging
+import logging.config
+import multiprocessing
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from communi_api.communi_api import CommuniApi
+
+logger = logging.getLogger(__name__)
+
+config_file = Path("logging_config.json")
+with config_file.open(encoding="utf-8") as f_in:
+    logging_config = json.load(f_in)
+    log_directory = Path(logging_config["handlers"]["file"]["filename"]).parent
+    if not log_directory.exists():
+        log_directory.mkdir(parents=True)
+    logging.config.dictConfig(config=logging_config)
+
+DEFAULT_MIX = {
+    "getGroups": 4,
+    "changeUserGroup": 3,
+    "message": 2,
+    "recommendation": 1,
+}
+STAND_IN_USERS = 50
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Request handler implementing the Communi endpoints used by CommuniApi."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "CommuniStandIn"
+
+    def log_message(self, *args) -> None:
+        """Keep stand-in requests out of the log."""
+
+    def _reply(self, content, status: int = 200) -> None:  # noqa: ANN001
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length)) if length else {}
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = url.path.removeprefix("/rest").strip("/").split("/")
+
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+        if self.server.random.random() < self.server.error_rate:
+            self._reply({"error": "simulated failure"}, 500)
+            return
+        if not self.headers.get("X-Authorization", "").startswith("Bearer "):
+            self._reply({"error": "unauthorized"}, 401)
+            return
+
+        status, content = self.server.dispatch(method, parts, query, payload)
+        self._reply(content, status)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PUT(self) -> None:
+        self._handle("PUT")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+
+class CommuniStandIn(ThreadingHTTPServer):
+    """In-memory Communi REST server for local load tests.
+
+    Every communiApp is a separate tenant with its own groups and memberships.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0) -> None:
+        """Args:
+        latency: seconds each request is delayed to simulate server time
+        error_rate: share of requests answered with status 500
+        """
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(0)  # noqa: S311
+        self.users = [
+            {"id": user_id, "firstName": "Test", "lastName": str(user_id)}
+            | {"mailadresse": f"user{user_id}@example.com"}
+            for user_id in range(1, STAND_IN_USERS + 1)
+        ]
+        self._groups = {}
+        self._memberships = {}
+        self._ids = itertools.count(1000)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """REST endpoint to be used as communi_server."""
+        return f"http://127.0.0.1:{self.server_address[1]}/rest"
+
+    def __enter__(self) -> "CommuniStandIn":
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Stop serving."""
+        self.shutdown()
+        self.server_close()
+
+    def _add_group(self, app: str, data: dict) -> dict:
+        """Create a group owned by the logged in user - caller holds the lock."""
+        group_id = next(self._ids)
+        group = {"id": group_id, **data}
+        self._groups.setdefault(app, {})[group_id] = group
+        owner = self.users[0]["id"]
+        self._memberships[group_id] = {
+            owner: {"user": owner, "group": group_id, "status": 2}
+        }
+        return group
+
+    def _tenant_groups(self, app: str | None) -> dict:
+        """Groups of a tenant - new tenants start with one default group."""
+        if app not in self._groups:
+            self._add_group(app, {"title": "Allgemein", "communiApp": app})
+        return self._groups[app]
+
+    def dispatch(  # noqa: C901, PLR0911
+        self, method: str, parts: list[str], query: dict, payload: dict
+    ) -> tuple[int, object]:
+        """Answer one request - returns status code and JSON content."""
+        endpoint = parts[0]
+        with self._lock:
+            if endpoint == "login":
+                return 200, self.users[0]
+            if endpoint == "user":
+                if "id" in query:
+                    return 200, self.users[int(query["id"]) - 1]
+                return 200, self.users
+            if endpoint == "group" and method == "GET":
+                groups = self._tenant_groups(query.get("communiApp"))
+                if "id" in query:
+                    group = groups.get(int(query["id"]))
+                    return 200, [group] if group else []
+                return 200, list(groups.values())
+            if endpoint == "group" and method == "POST":
+                return 200, self._add_group(str(payload["communiApp"]), payload)
+            if endpoint == "group" and method == "DELETE":
+                group_id = int(parts[1])
+                for groups in self._groups.values():
+                    groups.pop(group_id, None)
+                self._memberships.pop(group_id, None)
+                return 200, []
+            if endpoint == "UserGroup" and method == "GET":
+                memberships = [
+                    membership
+                    for group_id, members in self._memberships.items()
+                    if "group" not in query or str(group_id) == query["group"]
+                    for membership in members.values()
+                    if "user" not in query or str(membership["user"]) == query["user"]
+                ]
+                return 200, memberships
+            if endpoint == "UserGroup" and method == "PUT":
+                membership = {key: payload[key] for key in ("user", "group", "status")}
+                self._memberships.setdefault(payload["group"], {})[payload["user"]] = (
+                    membership
+                )
+                return 200, {**payload, "valid": True}
+            if endpoint in ("message", "recommendation"):
+                return 200, {"valid": True}
+        return 404, {"error": "not found"}
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def _create_group(communi_api: CommuniApi, tenant: int, attempts: int = 10) -> int:
+    """Create the group used by one tenant - retried because of simulated errors.
+
+    Raises:
+        RuntimeError: if the group could not be created
+    """
+    for _attempt in range(attempts):
+        group = communi_api.createGroup(f"_loadtest {tenant}", "load test group")
+        if group:
+            return group["id"]
+    msg = f"Could not create load test group for tenant {tenant}"
+    raise RuntimeError(msg)
+
+
+def _run_tenant(
+    communi_api: CommuniApi,
+    group_id: int,
+    operations: int,
+    mix: dict[str, int],
+    seed: int,
+) -> list[tuple[str, float, bool]]:
+    """Execute the operation mix for one tenant - returns (name, seconds, success)."""
+    rng = random.Random(seed)  # noqa: S311
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    calls = {
+        "getGroups": communi_api.getGroups,
+        "changeUserGroup": lambda: communi_api.changeUserGroup(
+            rng.randint(1, STAND_IN_USERS),
+            group_id,
+            add_user=rng.random() < 0.8,  # noqa: PLR2004
+        ),
+        "message": lambda: communi_api.message(group_id, "load test message"),
+        "recommendation": lambda: communi_api.recommendation(
+            group_id,
+            "load test",
+            "load test recommendation",
+            datetime.now(tz=timezone.utc),
+            link="https://github.com/bensteUEM/CommuniAPI/",
+        ),
+    }
+    results = []
+    for name in rng.choices(names, weights, k=operations):
+        start = time.perf_counter()
+        try:
+            success = bool(calls[name]())
+        except Exception:  # noqa: BLE001
+            success = False
+        results.append((name, time.perf_counter() - start, success))
+    return results
+
+
+def serve_stand_in(
+    latency: float, error_rate: float, urls: multiprocessing.Queue
+) -> None:
+    """Process target which runs a CommuniStandIn until terminated.
+
+    Args:
+        latency: see CommuniStandIn
+        error_rate: see CommuniStandIn
+        urls: queue which receives the url of the server once it is listening
+    """
+    server = CommuniStandIn(latency=latency, error_rate=error_rate)
+    urls.put(server.url)
+    server.serve_forever()
+
+
+@contextmanager
+def stand_in_process(latency: float = 0.0, error_rate: float = 0.0):  # noqa: ANN201
+    """Run a CommuniStandIn in a separate process.
+
+    Clients and server do not compete for the GIL of one process
+    and tracemalloc in this process only traces the clients.
+
+    Yields:
+        REST url of the stand-in
+    """
+    urls = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve_stand_in, args=(latency, error_rate, urls), daemon=True
+    )
+    process.start()
+    try:
+        yield urls.get(timeout=10)
+    finally:
+        process.terminate()
+        process.join()
+
+
+def _create_clients(
+    url: str, tenants: int, operations: int
+) -> list[tuple[CommuniApi, int]]:
+    """Create one client and load test group per tenant."""
+    clients = []
+    for tenant in range(tenants):
+        communi_api = CommuniApi(
+            url,
+            f"token-{tenant}",
+            tenant + 1,
+            lazy_login=True,
+            failure_threshold=operations + 1,
+        )
+        clients.append((communi_api, _create_group(communi_api, tenant)))
+    return clients
+
+
+def _run_clients(
+    clients: list[tuple[CommuniApi, int]], operations: int, mix: dict[str, int]
+) -> tuple[list[tuple[str, float, bool]], float]:
+    """Run all tenants concurrently - one thread each.
+
+    Returns:
+        all samples of _run_tenant and the duration in seconds
+    """
+    results = [None] * len(clients)
+
+    def worker(index: int) -> None:
+        communi_api, group_id = clients[index]
+        results[index] = _run_tenant(communi_api, group_id, operations, mix, index)
+
+    threads = [
+        threading.Thread(target=worker, args=(index,)) for index in range(len(clients))
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+    return [sample for samples in results for sample in samples], duration
+
+
+def _close_clients(clients: list[tuple[CommuniApi, int]]) -> None:
+    """Close the sessions of all clients."""
+    for communi_api, _group_id in clients:
+        communi_api.close()
+
+
+def measure_client_memory(
+    url: str, tenants: int, operations: int, mix: dict[str, int] | None = None
+) -> float:
+    """Memory allocated per client in KiB - after running the operation mix.
+
+    Runs separately from the timed pass because tracing slows down all clients.
+    Only this process is traced, so the stand-in should run in another process.
+
+    Args:
+        url: REST url of the stand-in
+        tenants: number of simulated tenants
+        operations: operations per tenant
+        mix: relative weights per operation. Defaults to DEFAULT_MIX.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        memory_before = tracemalloc.get_traced_memory()[0]
+        clients = _create_clients(url, tenants, operations)
+        _run_clients(clients, operations, mix or DEFAULT_MIX)
+        gc.collect()
+        memory_after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    _close_clients(clients)
+    return (memory_after - memory_before) / tenants / 1024
+
+
+def run_load_level(
+    url: str,
+    tenants: int,
+    operations: int,
+    mix: dict[str, int] | None = None,
+) -> dict:
+    """Run all tenants of one concurrency level against the stand-in.
+
+    Latency is measured in a first pass without tracing,
+    memory per client in a second pass - see measure_client_memory.
+
+    Args:
+        url: REST url of the stand-in - see stand_in_process
+        tenants: number of simulated tenants - one client and thread each
+        operations: operations per tenant
+        mix: relative weights per operation. Defaults to DEFAULT_MIX.
+
+    Returns:
+        dict with throughput, latency percentiles in ms, error rate
+        and memory per client in KiB
+    """
+    mix = mix or DEFAULT_MIX
+    clients = _create_clients(url, tenants, operations)
+    samples, duration = _run_clients(clients, operations, mix)
+    _close_clients(clients)
+
+    latencies = sorted(seconds * 1000 for _name, seconds, _success in samples)
+    errors = sum(not success for _name, _seconds, success in samples)
+    return {
+        "tenants": tenants,
+        "operations": len(samples),
+        "throughput": len(samples) / duration if duration else 0.0,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "memory_per_client_kib": measure_client_memory(url, tenants, operations, mix),
+    }
+
+
+def run_load_test(
+    tenant_levels: list[int],
+    operations: int = 100,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    mix: dict[str, int] | None = None,
+) -> list[dict]:
+    """Run the load test for increasing numbers of concurrent tenants.
+
+    The stand-in runs in a separate process - see stand_in_process.
+
+    Args:
+        tenant_levels: numbers of concurrent tenants e.g. [1, 2, 4, 8]
+        operations: operations per tenant and level
+        latency: simulated server time per request in seconds
+        error_rate: share of requests failing with status 500
+        mix: relative weights per operation. Defaults to DEFAULT_MIX.
+
+    Returns:
+        one result per level - see run_load_level
+    """
+    with stand_in_process(latency=latency, error_rate=error_rate) as url:
+        return [
+            run_load_level(url, tenants, operations, mix) for tenants in tenant_levels
+        ]
+
+
+def main() -> None:
+    """Command line entry point printing a result table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--operations", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    results = run_load_test(
+        args.tenants, args.operations, args.latency, args.error_rate
+    )
+    print(  # noqa: T201
+        f"{'tenants':>8} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'errors':>7} {'KiB/client':>11}"
+    )
+    for result in results:
+        print(  # noqa: T201
+            f"{result['tenants']:>8} {result['throughput']:>9.1f} "
+            f"{result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} "
+            f"{result['error_rate']:>7.2%} {result['memory_per_client_kib']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
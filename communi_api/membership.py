@@ -0,0 +1,190 @@
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+
+class MembershipGraph:
+    """In-memory user x group membership matrix.
+
+    Every user is mapped to a bit position and each group stores its members
+    as one integer bitset - set operations across groups are therefore done
+    with single integer operations instead of list lookups per user.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty membership graph."""
+        self._user_bits = {}
+        self._users = []
+        self._groups = {}
+
+    @classmethod
+    def from_user_group_list(
+        cls,
+        user_group_list: Iterable[dict] | Literal[False],
+        statuses: Iterable[int] | None = None,
+    ) -> "MembershipGraph":
+        """Build a graph from the result of CommuniApi.getUserGroupList.
+
+        Args:
+            user_group_list: UserGroup allocations - False is treated as empty
+            statuses: optional allocation status values to include e.g. (2,) for
+                active members only. Defaults to None which includes every status.
+
+        Returns:
+            new MembershipGraph
+        """
+        graph = cls()
+        allowed = None if statuses is None else set(statuses)
+        for item in user_group_list or []:
+            if allowed is None or item.get("status") in allowed:
+                graph.add(item["user"], item["group"])
+        return graph
+
+    def _bit(self, user_id: int) -> int:
+        """Get the bit for a user - new users are assigned the next free position."""
+        position = self._user_bits.get(user_id)
+        if position is None:
+            position = len(self._users)
+            self._user_bits[user_id] = position
+            self._users.append(user_id)
+        return 1 << position
+
+    def _mask(self, user_ids: Iterable[int]) -> int:
+        """Convert user IDs into a bitset."""
+        mask = 0
+        for user_id in user_ids:
+            mask |= self._bit(user_id)
+        return mask
+
+    def _user_ids(self, mask: int) -> set[int]:
+        """Convert a bitset back into user IDs."""
+        result = set()
+        while mask:
+            lowest = mask & -mask
+            result.add(self._users[lowest.bit_length() - 1])
+            mask ^= lowest
+        return result
+
+    def add_group(self, group_id: int) -> None:
+        """Register group_id - e.g. for groups without any members."""
+        self._groups.setdefault(group_id, 0)
+
+    def add(self, user_id: int, group_id: int) -> None:
+        """Register user_id as member of group_id."""
+        self._groups[group_id] = self._groups.get(group_id, 0) | self._bit(user_id)
+
+    def remove(self, user_id: int, group_id: int) -> None:
+        """Remove user_id from group_id if it is a member."""
+        if user_id in self._user_bits and group_id in self._groups:
+            self._groups[group_id] &= ~(1 << self._user_bits[user_id])
+
+    @property
+    def group_ids(self) -> set[int]:
+        """All group IDs known to the graph."""
+        return set(self._groups)
+
+    def is_member(self, user_id: int, group_id: int) -> bool:
+        """Check if user_id is member of group_id."""
+        position = self._user_bits.get(user_id)
+        if position is None:
+            return False
+        return bool(self._groups.get(group_id, 0) >> position & 1)
+
+    def members(self, group_id: int) -> set[int]:
+        """User IDs of all members of group_id."""
+        return self._user_ids(self._groups.get(group_id, 0))
+
+    def count(self, group_id: int) -> int:
+        """Number of members of group_id."""
+        return self._groups.get(group_id, 0).bit_count()
+
+    def groups_of(self, user_id: int) -> set[int]:
+        """Group IDs user_id is member of."""
+        return {
+            group_id for group_id in self._groups if self.is_member(user_id, group_id)
+        }
+
+    def users_in_any(self, group_ids: Iterable[int]) -> set[int]:
+        """User IDs which are member of at least one of the groups (union)."""
+        mask = 0
+        for group_id in group_ids:
+            mask |= self._groups.get(group_id, 0)
+        return self._user_ids(mask)
+
+    def users_in_all(self, group_ids: Iterable[int]) -> set[int]:
+        """User IDs which are member of every one of the groups (intersection)."""
+        mask = None
+        for group_id in group_ids:
+            group_mask = self._groups.get(group_id, 0)
+            mask = group_mask if mask is None else mask & group_mask
+        return self._user_ids(mask or 0)
+
+    def difference(self, group_id: int, other_group_id: int) -> set[int]:
+        """User IDs which are member of group_id but not of other_group_id."""
+        return self._user_ids(
+            self._groups.get(group_id, 0) & ~self._groups.get(other_group_id, 0)
+        )
+
+    def diff(
+        self, group_id: int, desired_user_ids: Iterable[int]
+    ) -> tuple[set[int], set[int]]:
+        """Compare desired members of a group with the actual members.
+
+        Args:
+            group_id: group to compare
+            desired_user_ids: user IDs which should be members
+
+        Returns:
+            tuple of user IDs (to_add, to_remove)
+        """
+        desired = self._mask(desired_user_ids)
+        actual = self._groups.get(group_id, 0)
+        return self._user_ids(desired & ~actual), self._user_ids(actual & ~desired)
+
+    def reconcile(
+        self, desired: dict[int, Iterable[int]]
+    ) -> dict[int, tuple[set[int], set[int]]]:
+        """Bulk version of diff for many groups at once.
+
+        Args:
+            desired: user IDs which should be members per group ID
+
+        Returns:
+            tuple of user IDs (to_add, to_remove) per group ID
+        """
+        return {
+            group_id: self.diff(group_id, user_ids)
+            for group_id, user_ids in desired.items()
+        }
+
+
+def load_membership_graph(
+    communi_api,
+    group_ids: Iterable[int],
+    max_workers: int = 8,
+    statuses: Iterable[int] | None = None,
+) -> MembershipGraph:
+    """Fetch the members of several groups concurrently into one graph.
+
+    Args:
+        communi_api: connected CommuniApi instance
+        group_ids: groups to load
+        max_workers: number of concurrent requests. Defaults to 8.
+        statuses: see MembershipGraph.from_user_group_list
+
+    Returns:
+        MembershipGraph containing all loaded groups
+    """
+    group_ids = list(group_ids)
+    with (
+        communi_api.concurrent_client(max_workers) as client,
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+    ):
+        results = executor.map(
+            lambda group_id: client.getUserGroupList(group=group_id), group_ids
+        )
+        user_group_list = [item for result in results for item in result or []]
+    graph = MembershipGraph.from_user_group_list(user_group_list, statuses=statuses)
+    for group_id in group_ids:
+        graph.add_group(group_id)
+    return graph
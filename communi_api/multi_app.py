@@ -0,0 +1,142 @@
+import json
+import logging
+import logging.config
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from communi_api.churchToolsActions import (
+    apply_event_plan,
+    load_service_masterdata,
+    plan_event_chats,
+)
+from communi_api.group_registry import GroupRegistry
+from communi_api.roster import PersonRegistry
+from communi_api.rules import DEFAULT_RULES, SyncRules
+
+logger = logging.getLogger(__name__)
+
+config_file = Path("logging_config.json")
+with config_file.open(encoding="utf-8") as f_in:
+    logging_config = json.load(f_in)
+    log_directory = Path(logging_config["handlers"]["file"]["filename"]).parent
+    if not log_directory.exists():
+        log_directory.mkdir(parents=True)
+    logging.config.dictConfig(config=logging_config)
+
+
+@dataclass
+class AppTarget:
+    """One Communi app which should receive event chats.
+
+    Attributes:
+        name: label used for logging and results
+        communi_api: client of the app - use rate_limiter on it for individual limits
+        rules: relevance, exclusion and role rules of this app
+        route: optional filter which receives each plan and returns
+            if the event belongs to this app. Defaults to all relevant events.
+        registry: optional lifecycle registry of the groups in this app
+    """
+
+    name: str
+    communi_api: object
+    rules: SyncRules = DEFAULT_RULES
+    route: Callable[[dict], bool] | None = None
+    registry: GroupRegistry | None = None
+
+
+def combine_relevance_rules(rules: list[SyncRules]) -> SyncRules:
+    """Create rules which consider an event relevant if any of the rules do.
+
+    Args:
+        rules: rules of all apps
+
+    Returns:
+        SyncRules with the union of all relevant service groups and services
+    """
+    return SyncRules(
+        relevant_service_groups=frozenset().union(
+            *(item.relevant_service_groups for item in rules)
+        ),
+        relevant_services=frozenset().union(
+            *(item.relevant_services for item in rules)
+        ),
+    )
+
+
+def _sync_app(app: AppTarget, plans: list[dict]) -> dict:
+    """Apply all plans of one app - errors are reported instead of raised."""
+    result = {"events": {}, "success": True, "error": None}
+    try:
+        for plan in plans:
+            success = apply_event_plan(
+                app.communi_api, plan, app.rules, app.registry
+            )
+            result["events"][plan["event_id"]] = success
+            result["success"] &= success
+    except Exception as error:
+        logger.exception("Sync for app %s failed", app.name)
+        result["success"] = False
+        result["error"] = str(error)
+    return result
+
+
+def create_event_chats_for_apps(
+    ct_api,
+    apps: list[AppTarget],
+    event_ids: list[int],
+    only_relevant: bool = True,  # noqa: FBT001, FBT002
+    person_cache: PersonRegistry | None = None,
+) -> dict[str, dict]:
+    """Create event chats in several Communi apps from one ChurchTools fetch.
+
+    Events, masterdata and persons are loaded once for all apps.
+    Each app then applies its share of the plans concurrently to the other apps.
+
+    Args:
+        ct_api: link to ChurchTools
+        apps: Communi apps to sync
+        event_ids: list of CT event IDs to take into account
+        only_relevant: if true - relevance rules of each app are applied
+        person_cache: optional registry of persons shared between runs
+
+    Returns:
+        result per app name - dict with events (success per event ID),
+        success (bool for all events) and error (message if the app failed)
+    """
+    masterdata = load_service_masterdata(ct_api)
+    plans = plan_event_chats(
+        ct_api,
+        event_ids,
+        only_relevant=only_relevant,
+        rules=combine_relevance_rules([app.rules for app in apps]),
+        person_cache=person_cache,
+        masterdata=masterdata,
+    )
+
+    plans_by_app = {}
+    for app in apps:
+        relevant_service_ids = app.rules.compile(*masterdata).relevant_service_ids
+        plans_by_app[app.name] = [
+            plan
+            for plan in plans
+            if (
+                not only_relevant
+                or not relevant_service_ids.isdisjoint(plan["service_ids"])
+            )
+            and (app.route is None or app.route(plan))
+        ]
+        logger.info(
+            "Routed %s of %s events to app %s",
+            len(plans_by_app[app.name]),
+            len(plans),
+            app.name,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(len(apps), 1)) as executor:
+        futures = {
+            app.name: executor.submit(_sync_app, app, plans_by_app[app.name])
+            for app in apps
+        }
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,140 @@
+import cProfile
+import json
+import logging
+import logging.config
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+config_file = Path("logging_config.json")
+with config_file.open(encoding="utf-8") as f_in:
+    logging_config = json.load(f_in)
+    log_directory = Path(logging_config["handlers"]["file"]["filename"]).parent
+    if not log_directory.exists():
+        log_directory.mkdir(parents=True)
+    logging.config.dictConfig(config=logging_config)
+
+PROFILE_ENV_VAR = "COMMUNI_PROFILE"
+CPROFILE_ENV_VAR = "COMMUNI_PROFILE_CPROFILE"
+
+_active_profiler = None
+
+
+class Profiler:
+    """Collects timed spans of one run and saves them as Chrome trace file.
+
+    The trace can be opened with chrome://tracing, https://ui.perfetto.dev
+    or https://www.speedscope.app for a flame graph view.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        use_cprofile: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Args:
+        path: target file for the Chrome trace
+        use_cprofile: additionally record a cProfile next to the trace (suffix .prof)
+        """
+        self.path = Path(path)
+        self.events = []
+        self._start = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._cprofile = cProfile.Profile() if use_cprofile else None
+
+    def _now(self) -> int:
+        """Microseconds since start of the profiler."""
+        return (time.perf_counter_ns() - self._start) // 1000
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", **args):  # noqa: ANN201
+        """Record the duration of the wrapped block.
+
+        Args:
+            name: label of the span
+            category: group of spans e.g. phase, communi or churchtools
+            args: additional details shown with the span
+        """
+        start = self._now()
+        try:
+            yield
+        finally:
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start,
+                    "dur": self._now() - start,
+                    "pid": self._pid,
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def start(self) -> None:
+        """Start cProfile if enabled."""
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        """Stop cProfile if enabled and save all results."""
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.path.with_suffix(".prof"))
+        with self.path.open("w", encoding="utf-8") as f_out:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f_out)
+        logger.info("Saved profile with %s spans to %s", len(self.events), self.path)
+
+
+def span(name: str, category: str = "phase", **args):  # noqa: ANN201
+    """Record a span with the active profiler - does nothing if profiling is off.
+
+    Args:
+        name: label of the span
+        category: group of spans e.g. phase, communi or churchtools
+        args: additional details shown with the span
+    """
+    if _active_profiler is None:
+        return nullcontext()
+    return _active_profiler.span(name, category, **args)
+
+
+@contextmanager
+def profile_run(  # noqa: ANN201
+    path: str | Path | None = None,
+    *,
+    use_cprofile: bool | None = None,
+):
+    """Profile the wrapped block if a path is given or set in COMMUNI_PROFILE.
+
+    Args:
+        path: target file for the Chrome trace. Defaults to env COMMUNI_PROFILE.
+        use_cprofile: also record cProfile stats.
+            Defaults to env COMMUNI_PROFILE_CPROFILE being set to 1.
+
+    Yields:
+        the active Profiler or None if profiling is off
+    """
+    global _active_profiler  # noqa: PLW0603
+    path = path or os.environ.get(PROFILE_ENV_VAR)
+    if not path or _active_profiler is not None:
+        # profiling is off or an outer run is already profiling
+        yield _active_profiler
+        return
+
+    if use_cprofile is None:
+        use_cprofile = os.environ.get(CPROFILE_ENV_VAR) == "1"
+    profiler = Profiler(path, use_cprofile=use_cprofile)
+    _active_profiler = profiler
+    profiler.start()
+    try:
+        with profiler.span("run"):
+            yield profiler
+    finally:
+        _active_profiler = None
+        profiler.stop()
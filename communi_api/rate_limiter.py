@@ -0,0 +1,66 @@
+import multiprocessing
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe limiter which spaces out calls to a maximum rate.
+
+    Each call to acquire() reserves the next free time slot
+    and sleeps until that slot is reached.
+    A shared limiter keeps its state in shared memory - it can be handed to
+    worker processes on creation (e.g. as initargs of a ProcessPoolExecutor)
+    and limits the calls of all processes together.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        shared: bool = False,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Args:
+        requests_per_second: maximum calls per second - 0 or less disables limiting
+        shared: if the limit should apply across processes
+        """
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.shared = shared
+        if shared:
+            self._next_slot = multiprocessing.Value("d", 0.0)
+            self._lock = self._next_slot.get_lock()
+        else:
+            self._next_slot = 0.0
+            self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        """Pickle support - local locks are recreated in the target process."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore a pickled limiter."""
+        self.__dict__.update(state)
+        self._lock = self._next_slot.get_lock() if self.shared else threading.Lock()
+
+    def _reserve(self, now: float) -> float:
+        """Reserve the next free slot - requires the lock to be held."""
+        if self.shared:
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + self.interval
+        else:
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        return slot
+
+    def acquire(self) -> None:
+        """Block until the caller is allowed to issue the next request."""
+        if self.interval <= 0:
+            return
+        # wall clock time is comparable between processes
+        clock = time.time if self.shared else time.monotonic
+        with self._lock:
+            now = clock()
+            slot = self._reserve(now)
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,175 @@
+from collections.abc import Iterable, Iterator, Mapping
+
+
+class Person:
+    """Person record kept once per ChurchTools person ID."""
+
+    __slots__ = ("email", "first_name", "id", "last_name")
+
+    def __init__(
+        self, person_id: int, email: str, first_name: str, last_name: str
+    ) -> None:
+        """Args:
+        person_id: ChurchTools person ID
+        email: mail address used to match Communi users
+        first_name: first name
+        last_name: last name
+        """
+        self.id = person_id
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+
+    def __repr__(self) -> str:
+        """Short representation for debugging."""
+        return f"Person({self.id}, {self.email!r})"
+
+
+class PersonRegistry:
+    """Interned Person records by ChurchTools ID shared between events.
+
+    Only the fields used for groups are kept from the ChurchTools response.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty registry."""
+        self._persons = {}
+
+    def __contains__(self, person_id: int) -> bool:
+        """Check if a person is already known."""
+        return person_id in self._persons
+
+    def __getitem__(self, person_id: int) -> Person:
+        """Person record by ChurchTools ID."""
+        return self._persons[person_id]
+
+    def __len__(self) -> int:
+        """Number of known persons."""
+        return len(self._persons)
+
+    def missing(self, person_ids: Iterable[int | None]) -> set[int]:
+        """IDs which still need to be loaded - None is ignored."""
+        return {
+            person_id
+            for person_id in person_ids
+            if person_id is not None and person_id not in self._persons
+        }
+
+    def add(self, ct_person: dict) -> Person:
+        """Register a person from ChurchTools - an existing record is updated in place.
+
+        Args:
+            ct_person: person as returned by ChurchToolsApi.get_persons
+
+        Returns:
+            the shared Person record
+        """
+        person = self._persons.get(ct_person["id"])
+        if person is None:
+            person = Person(
+                ct_person["id"],
+                ct_person["email"],
+                ct_person["firstName"],
+                ct_person["lastName"],
+            )
+            self._persons[person.id] = person
+        else:
+            person.email = ct_person["email"]
+            person.first_name = ct_person["firstName"]
+            person.last_name = ct_person["lastName"]
+        return person
+
+
+class ServiceAssignment:
+    """One person assigned to one service of an event."""
+
+    __slots__ = ("agreed", "person")
+
+    def __init__(self, person: Person, agreed: bool) -> None:  # noqa: FBT001
+        """Args:
+        person: shared record from PersonRegistry
+        agreed: False if the person did not confirm the service yet
+        """
+        self.person = person
+        self.agreed = agreed
+
+    @property
+    def display(self) -> str:
+        """Name shown in group messages - prefixed with ? if not confirmed."""
+        return (
+            f"{'' if self.agreed else '?'} "
+            f"{self.person.first_name} {self.person.last_name}"
+        )
+
+    def as_tuple(self) -> tuple[str, str]:
+        """(email, display) as used by update_group_users_by_services."""
+        return self.person.email, self.display
+
+
+class EventRoster(Mapping):
+    """Service assignments of one event referencing shared Person records.
+
+    Reads like the dict of generate_services_for_event:
+    service group name -> service name -> list of (email, display) tuples.
+    The tuples are only created when accessed.
+    """
+
+    __slots__ = ("_service_groups", "event_id")
+
+    def __init__(self, event_id: int, service_group_names: Iterable[str]) -> None:
+        """Args:
+        event_id: ChurchTools event ID
+        service_group_names: all service groups - included even if empty
+        """
+        self.event_id = event_id
+        self._service_groups = {name: {} for name in service_group_names}
+
+    def add(
+        self,
+        service_group_name: str,
+        service_name: str,
+        person: Person | None = None,
+        agreed: bool = True,  # noqa: FBT001, FBT002
+    ) -> None:
+        """Add a service - with an assigned person unless person is None."""
+        assignments = self._service_groups[service_group_name].setdefault(
+            service_name, []
+        )
+        if person is not None:
+            assignments.append(ServiceAssignment(person, agreed))
+
+    def assignments(self) -> Iterator[tuple[str, str, ServiceAssignment]]:
+        """All assignments as (service group name, service name, assignment)."""
+        for service_group_name, services in self._service_groups.items():
+            for service_name, assignments in services.items():
+                for assignment in assignments:
+                    yield service_group_name, service_name, assignment
+
+    def persons(self) -> set[Person]:
+        """Unique persons assigned to any service of the event."""
+        return {assignment.person for *_names, assignment in self.assignments()}
+
+    def __getitem__(self, service_group_name: str) -> dict[str, list[tuple[str, str]]]:
+        """Services of one service group in the dict shape."""
+        return {
+            service_name: [assignment.as_tuple() for assignment in assignments]
+            for service_name, assignments in self._service_groups[
+                service_group_name
+            ].items()
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        """Service group names."""
+        return iter(self._service_groups)
+
+    def __len__(self) -> int:
+        """Number of service groups."""
+        return len(self._service_groups)
+
+    def __repr__(self) -> str:
+        """Short representation for debugging."""
+        return f"EventRoster({self.event_id}, {len(self.persons())} persons)"
+
+    def to_dict(self) -> dict[str, dict[str, list[tuple[str, str]]]]:
+        """Convert to the dict returned by generate_services_for_event."""
+        return {name: self[name] for name in self}
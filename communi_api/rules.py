@@ -0,0 +1,132 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """SyncRules resolved against ChurchTools masterdata into ID based lookups.
+
+    Relevance of an event can be decided from the serviceIds of its eventServices
+    alone - before any person is resolved.
+    Exclusions and roles are applied by name when a group is updated.
+    """
+
+    relevant_service_ids: frozenset[int]
+
+    def is_event_relevant(self, event: dict) -> bool:
+        """Check relevance of a ChurchTools event loaded with include="eventServices".
+
+        Args:
+            event: event as returned by ChurchToolsApi.get_events
+
+        Returns:
+            if the event has at least one relevant service
+        """
+        return any(
+            service["serviceId"] in self.relevant_service_ids
+            for service in event.get("eventServices", [])
+        )
+
+
+@dataclass(frozen=True)
+class SyncRules:
+    """Declarative rules used to sync ChurchTools events into Communi groups.
+
+    All names refer to ChurchTools service and service group names.
+    The defaults reflect the original setup of Evang. Kirche Baiersbronn.
+    """
+
+    relevant_service_groups: frozenset[str] = frozenset({"Technik"})
+    relevant_services: frozenset[str] = frozenset()
+    excluded_services: frozenset[str] = frozenset(
+        {"Begrüßung & Opferzählen", "Opfer zählen"}
+    )
+    excluded_service_groups: frozenset[str] = frozenset()
+    service_roles: dict[str, int] = field(default_factory=dict)
+    default_role: int = 40
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "SyncRules":
+        """Create rules from a config dict - missing keys use the defaults.
+
+        Args:
+            config: dict using the attribute names of this class as keys
+                with lists of names and a dict of service name to role ID
+
+        Returns:
+            new SyncRules
+        """
+        kwargs = {
+            key: frozenset(config[key])
+            for key in (
+                "relevant_service_groups",
+                "relevant_services",
+                "excluded_services",
+                "excluded_service_groups",
+            )
+            if key in config
+        }
+        if "service_roles" in config:
+            kwargs["service_roles"] = dict(config["service_roles"])
+        if "default_role" in config:
+            kwargs["default_role"] = config["default_role"]
+        return cls(**kwargs)
+
+    @classmethod
+    def from_json(cls, path: str | Path) -> "SyncRules":
+        """Load rules from a JSON file - see from_dict for the structure."""
+        with Path(path).open(encoding="utf-8") as f_in:
+            return cls.from_dict(json.load(f_in))
+
+    def is_relevant(self, event_services: dict) -> bool:
+        """Check relevance based on the result of generate_services_for_event.
+
+        Args:
+            event_services: dict of service group name to dict of service names
+
+        Returns:
+            if at least one relevant service group or service is part of the event
+        """
+        for service_group_name, services in event_services.items():
+            if service_group_name in self.relevant_service_groups and len(services) > 0:
+                return True
+            if not self.relevant_services.isdisjoint(services):
+                return True
+        return False
+
+    def is_excluded(self, service_name: str, service_group_name: str) -> bool:
+        """Check if persons of a service should not be added to the group."""
+        return (
+            service_name in self.excluded_services
+            or service_group_name in self.excluded_service_groups
+        )
+
+    def role_for(self, service_name: str) -> int:
+        """Communi role ID used for persons of a service."""
+        return self.service_roles.get(service_name, self.default_role)
+
+    def compile(self, service_names: dict, service_groups: dict) -> CompiledRules:
+        """Resolve the name based relevance rules into service ID lookups.
+
+        Args:
+            service_names: ChurchToolsApi.get_services(returnAsDict=True)
+            service_groups: ChurchToolsApi.get_event_masterdata(
+                resultClass="serviceGroups", returnAsDict=True)
+
+        Returns:
+            CompiledRules for the given masterdata
+        """
+        relevant = set()
+        for service_id, service in service_names.items():
+            service_group = service_groups.get(service["serviceGroupId"], {})
+            service_group_name = service_group.get("name")
+            if (
+                service_group_name in self.relevant_service_groups
+                or service["name"] in self.relevant_services
+            ):
+                relevant.add(service_id)
+        return CompiledRules(relevant_service_ids=frozenset(relevant))
+
+
+DEFAULT_RULES = SyncRules()
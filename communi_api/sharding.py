@@ -0,0 +1,170 @@
+import json
+import logging
+import logging.config
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from communi_api.churchToolsActions import apply_event_plan, plan_event_chats
+from communi_api.communi_api import CommuniApi
+from communi_api.rules import DEFAULT_RULES, SyncRules
+
+logger = logging.getLogger(__name__)
+
+config_file = Path("logging_config.json")
+with config_file.open(encoding="utf-8") as f_in:
+    logging_config = json.load(f_in)
+    log_directory = Path(logging_config["handlers"]["file"]["filename"]).parent
+    if not log_directory.exists():
+        log_directory.mkdir(parents=True)
+    logging.config.dictConfig(config=logging_config)
+
+_worker_rate_limiter = None
+
+
+def shard_events_by_date(events: list[dict], shards: int) -> list[list[int]]:
+    """Split events into date ranges of similar size.
+
+    Args:
+        events: ChurchTools events e.g. from get_x_day_events
+        shards: maximum number of shards
+
+    Returns:
+        list of event ID lists - each covering a continuous date range
+    """
+    ordered = sorted(events, key=lambda event: event["startDate"])
+    shards = max(1, min(shards, len(ordered)))
+    size, remainder = divmod(len(ordered), shards)
+    result = []
+    start = 0
+    for shard in range(shards):
+        end = start + size + (1 if shard < remainder else 0)
+        result.append([event["id"] for event in ordered[start:end]])
+        start = end
+    return [shard for shard in result if shard]
+
+
+def _init_worker(rate_limiter) -> None:
+    """Keep the shared rate limiter of the parent process for this worker."""
+    global _worker_rate_limiter  # noqa: PLW0603
+    _worker_rate_limiter = rate_limiter
+
+
+def _warm_session_cache(connection: dict, rate_limiter) -> None:  # noqa: ANN001
+    """Login once in the parent so all workers find a valid session cache entry."""
+    if not connection.get("session_cache"):
+        return
+    communi_api = CommuniApi(
+        connection["communi_server"],
+        connection["communi_token"],
+        connection["communi_appid"],
+        session_cache=connection["session_cache"],
+        rate_limiter=rate_limiter,
+    )
+    communi_api.close()
+
+
+def _run_shard(
+    connection: dict,
+    event_ids: list[int],
+    only_relevant: bool,  # noqa: FBT001
+    rules: SyncRules,
+) -> dict:
+    """Create event chats for one shard with connections owned by this process."""
+    from churchtools_api.churchtools_api import ChurchToolsApi
+
+    start = time.perf_counter()
+    ct_api = ChurchToolsApi(connection["ct_domain"], connection["ct_token"])
+    communi_api = CommuniApi(
+        connection["communi_server"],
+        connection["communi_token"],
+        connection["communi_appid"],
+        lazy_login=True,
+        session_cache=connection.get("session_cache"),
+        rate_limiter=_worker_rate_limiter,
+    )
+
+    result = {"events": {}, "metrics": {"planned": 0, "failed": 0}}
+    plans = plan_event_chats(ct_api, event_ids, only_relevant, rules)
+    result["metrics"]["planned"] = len(plans)
+    for plan in plans:
+        success = apply_event_plan(communi_api, plan, rules)
+        result["events"][plan["event_id"]] = success
+        result["metrics"]["failed"] += not success
+    result["metrics"]["duration"] = time.perf_counter() - start
+    return result
+
+
+def create_event_chats_sharded(  # noqa: PLR0913
+    connection: dict,
+    events: list[dict],
+    processes: int = 4,
+    only_relevant: bool = True,  # noqa: FBT001, FBT002
+    rules: SyncRules = DEFAULT_RULES,
+    rate_limiter=None,
+) -> dict:
+    """Create event chats for a large set of events using several processes.
+
+    Events are split by date range - each process creates its own
+    ChurchTools and Communi connection and works on one shard.
+    A session_cache is filled by one login before the workers start.
+    Errors of a shard are reported in the result - other shards are kept.
+
+    Args:
+        connection: dict with ct_domain, ct_token, communi_server, communi_token,
+            communi_appid and optional session_cache
+        events: ChurchTools events e.g. from get_x_day_events
+        processes: number of worker processes. Defaults to 4.
+        only_relevant: if true - filter for relevant groups is applied
+        rules: relevance, exclusion and role rules to apply
+        rate_limiter: optional RateLimiter(shared=True) applied to the Communi
+            requests of all processes together
+
+    Returns:
+        dict with events (success per event ID), success (bool for all events),
+        errors (message per failed shard index - its events count as failed)
+        and metrics (summed counts and per shard durations)
+    """
+    shards = shard_events_by_date(events, processes)
+    logger.info("Processing %s events in %s shards", len(events), len(shards))
+
+    merged = {
+        "events": {},
+        "success": True,
+        "errors": {},
+        "metrics": {
+            "shards": len(shards),
+            "events": len(events),
+            "planned": 0,
+            "failed": 0,
+            "durations": [],
+        },
+    }
+    if not shards:
+        return merged
+
+    _warm_session_cache(connection, rate_limiter)
+
+    with ProcessPoolExecutor(
+        max_workers=len(shards), initializer=_init_worker, initargs=(rate_limiter,)
+    ) as executor:
+        futures = [
+            executor.submit(_run_shard, connection, shard, only_relevant, rules)
+            for shard in shards
+        ]
+        for index, (shard, future) in enumerate(zip(shards, futures, strict=True)):
+            try:
+                result = future.result()
+            except Exception as error:
+                logger.exception("Shard %s with %s events failed", index, len(shard))
+                merged["errors"][index] = str(error)
+                merged["events"].update(dict.fromkeys(shard, False))
+                merged["metrics"]["failed"] += len(shard)
+                continue
+            merged["events"].update(result["events"])
+            merged["metrics"]["planned"] += result["metrics"]["planned"]
+            merged["metrics"]["failed"] += result["metrics"]["failed"]
+            merged["metrics"]["durations"].append(result["metrics"]["duration"])
+
+    merged["success"] = merged["metrics"]["failed"] == 0
+    return merged
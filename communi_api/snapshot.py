@@ -0,0 +1,255 @@
+import gzip
+import json
+import logging
+import logging.config
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+config_file = Path("logging_config.json")
+with config_file.open(encoding="utf-8") as f_in:
+    logging_config = json.load(f_in)
+    log_directory = Path(logging_config["handlers"]["file"]["filename"]).parent
+    if not log_directory.exists():
+        log_directory.mkdir(parents=True)
+    logging.config.dictConfig(config=logging_config)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def _as_list(response_content) -> list:
+    """Normalize CommuniApi list results which might be False or a single dict."""
+    if not response_content:
+        return []
+    if isinstance(response_content, dict):
+        return [response_content]
+    return response_content
+
+
+def _open(path: Path, mode: str):
+    """Open a snapshot file - gzip compressed if the suffix is .gz."""
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def export_snapshot(communi_api, path: str | Path, max_workers: int = 8) -> dict:
+    """Crawl users, groups and all memberships of an app into a snapshot file.
+
+    The file is written as JSON lines - one record per line with a "type" field
+    (meta, user, group or membership). Files ending with .gz are gzip compressed.
+
+    Args:
+        communi_api: connected CommuniApi instance
+        path: target file
+        max_workers: number of concurrent requests used for the crawl. Defaults to 8.
+
+    Returns:
+        number of records per type
+    """
+    path = Path(path)
+    with (
+        communi_api.concurrent_client(max_workers) as client,
+        ThreadPoolExecutor(max_workers=max_workers) as executor,
+    ):
+        users_future = executor.submit(client.getUserList)
+        groups = _as_list(client.getGroups())
+        membership_futures = [
+            executor.submit(client.getUserGroupList, group=group["id"])
+            for group in groups
+        ]
+        users = _as_list(users_future.result())
+        memberships = [
+            membership
+            for future in membership_futures
+            for membership in _as_list(future.result())
+        ]
+
+    meta = {
+        "type": "meta",
+        "format": SNAPSHOT_FORMAT_VERSION,
+        "communiApp": communi_api.communi_appid,
+        "user_id": getattr(communi_api, "user_id", None),
+        "created": datetime.now().astimezone().isoformat(),
+    }
+    with _open(path, "w") as f_out:
+        f_out.write(json.dumps(meta, separators=(",", ":")) + "\n")
+        for record_type, records in (
+            ("user", users),
+            ("group", groups),
+            ("membership", memberships),
+        ):
+            for record in records:
+                f_out.write(
+                    json.dumps(
+                        {"type": record_type, "data": record},
+                        separators=(",", ":"),
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+
+    counts = {"user": len(users), "group": len(groups), "membership": len(memberships)}
+    logger.info("Exported snapshot %s with %s", path, counts)
+    return counts
+
+
+class OfflineCommuniApi:
+    """Read-only stand-in for CommuniApi which serves data from a snapshot file.
+
+    Read methods mirror the filters of CommuniApi without any API calls,
+    all methods which would change data in Communi return False.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Args:
+        path: snapshot file created by export_snapshot
+        """
+        self.path = Path(path)
+        self.users = []
+        self.groups = []
+        self.memberships = []
+        records = {
+            "user": self.users,
+            "group": self.groups,
+            "membership": self.memberships,
+        }
+
+        with _open(self.path, "r") as f_in:
+            meta = json.loads(f_in.readline())
+            if meta.get("format") != SNAPSHOT_FORMAT_VERSION:
+                logger.warning(
+                    "Snapshot %s has unexpected format %s", path, meta.get("format")
+                )
+            for line in f_in:
+                record = json.loads(line)
+                records[record["type"]].append(record["data"])
+
+        self.communi_appid = meta["communiApp"]
+        self.created = meta["created"]
+        if meta.get("user_id") is not None:
+            self.user_id = meta["user_id"]
+
+        self._users_by_id = {user["id"]: user for user in self.users}
+        self._groups_by_id = {group["id"]: group for group in self.groups}
+        self._memberships_by_group = {}
+        self._memberships_by_user = {}
+        for membership in self.memberships:
+            self._memberships_by_group.setdefault(membership["group"], []).append(
+                membership
+            )
+            self._memberships_by_user.setdefault(membership["user"], []).append(
+                membership
+            )
+        logger.debug("Loaded snapshot %s from %s", path, self.created)
+
+    def __str__(self) -> str:
+        """Default print option for the class."""
+        return (
+            f"This is an offline Communi API instance for CommuniApp "
+            f"{self.communi_appid} loaded from {self.path} ({self.created})"
+        )
+
+    def who_am_i(self) -> dict | bool:
+        """Return the user which created the snapshot or False if unknown."""
+        if not hasattr(self, "user_id"):
+            return False
+        return self.getUserList(userId=self.user_id)
+
+    def getUserList(self, **kwargs) -> list | dict | bool:
+        """Same as CommuniApi.getUserList but served from the snapshot.
+
+        Keyword Args:
+            userId: user Id to filter by
+        """
+        if "userId" in kwargs:
+            return self._users_by_id.get(kwargs["userId"], False)
+        return self.users
+
+    def getUserGroupList(self, **kwargs) -> list | bool:
+        """Same as CommuniApi.getUserGroupList but served from the snapshot.
+
+        Keyword Args:
+            group: group ID for filter
+            user: user ID for filter
+        """
+        if "group" in kwargs:
+            result = self._memberships_by_group.get(kwargs["group"], [])
+            if "user" in kwargs:
+                result = [item for item in result if item["user"] == kwargs["user"]]
+        elif "user" in kwargs:
+            result = self._memberships_by_user.get(kwargs["user"], [])
+        else:
+            result = self.memberships
+        return result if len(result) > 0 else False
+
+    def getGroups(self, **kwargs) -> list | dict | bool:
+        """Same as CommuniApi.getGroups but served from the snapshot.
+
+        Keyword Args:
+            id: get only group with matching id
+            name: get only group with matching name
+        """
+        if "id" in kwargs:
+            result = (
+                [self._groups_by_id[kwargs["id"]]]
+                if kwargs["id"] in self._groups_by_id
+                else []
+            )
+        else:
+            result = self.groups
+        if len(result) == 0:
+            return False
+        if "name" in kwargs:
+            result = [item for item in result if item["title"] == kwargs["name"]]
+        return result[0] if len(result) == 1 else result
+
+    def is_available(self, endpoint: str | None = None) -> bool:  # noqa: ARG002
+        """Same as CommuniApi.is_available - a snapshot is always available."""
+        return True
+
+    def iter_groups(self, **kwargs) -> Iterator[dict]:
+        """Same as CommuniApi.iter_groups but served from the snapshot.
+
+        Keyword Args:
+            id: get only group with matching id
+            name: get only groups with matching name
+            title_prefix: get only groups with a title starting with this text
+        """
+        if "id" not in kwargs:
+            groups = self.groups
+        elif kwargs["id"] in self._groups_by_id:
+            groups = [self._groups_by_id[kwargs["id"]]]
+        else:
+            groups = []
+        for group in groups:
+            if "name" in kwargs and group["title"] != kwargs["name"]:
+                continue
+            if "title_prefix" in kwargs and not group["title"].startswith(
+                kwargs["title_prefix"]
+            ):
+                continue
+            yield group
+
+    def find_group(self, **kwargs) -> dict | None:
+        """Same as CommuniApi.find_group but served from the snapshot."""
+        return next(self.iter_groups(**kwargs), None)
+
+    def iter_user_group_list(self, **kwargs) -> Iterator[dict]:
+        """Same as CommuniApi.iter_user_group_list but served from the snapshot."""
+        yield from self.getUserGroupList(**kwargs) or []
+
+    def _read_only(self, *_args, **_kwargs) -> bool:
+        """Placeholder for all methods which would change data in Communi."""
+        logger.warning("Offline snapshot %s is read-only", self.path)
+        return False
+
+    login = _read_only
+    createGroup = _read_only
+    deleteGroup = _read_only
+    changeUserGroup = _read_only
+    message = _read_only
+    recommendation = _read_only
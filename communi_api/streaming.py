@@ -0,0 +1,133 @@
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+# last character of a string, object or array - numbers and literals need a delimiter
+_CLOSING = '"}]'
+
+
+def _describe(char: str) -> str:
+    """Character for error messages - empty means the stream ended."""
+    return repr(char) if char else "end of stream"
+
+
+class _TextStream:
+    """Decoded text of a byte stream which is read on demand."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        """Args:
+        chunks: raw bytes of the JSON document
+        """
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+
+    def refill(self) -> bool:
+        """Drop consumed text and append the next chunk - False if the stream ended."""
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.position :] + text
+                self.position = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        """Next character after whitespace - empty if the stream ended."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in _WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.refill():
+                return ""
+
+    def _is_complete(self, end: int) -> bool:
+        """Check if a value decoded up to end can not continue in the next chunk."""
+        if self.buffer[end - 1] in _CLOSING:
+            return True
+        return end < len(self.buffer) and self.buffer[end] in _DELIMITERS
+
+    def decode(self, decoder: json.JSONDecoder) -> object:
+        """Decode the value at the current position - reads until it is complete."""
+        char = self.peek()
+        if not char:
+            msg = "JSON array is not terminated"
+            raise ValueError(msg)
+        if char in ",]":
+            msg = f"Expected JSON value but found {char!r}"
+            raise ValueError(msg)
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                end = None
+            if end is not None and self._is_complete(end):
+                self.position = end
+                return item
+            if not self.refill():
+                break
+
+        if end is None or end == len(self.buffer):
+            msg = "JSON array is not terminated"
+        else:
+            msg = f"Invalid JSON value {self.buffer[self.position : end + 1]!r}"
+        raise ValueError(msg)
+
+    def expect(self, expected: str, description: str) -> str:
+        """Consume the next character if it is one of expected.
+
+        Args:
+            expected: allowed characters
+            description: used for the error message
+
+        Returns:
+            the consumed character
+
+        Raises:
+            ValueError: if any other character or the end of stream is found
+        """
+        char = self.peek()
+        if not char or char not in expected:
+            msg = f"Expected {description} but found {_describe(char)}"
+            raise ValueError(msg)
+        self.position += 1
+        return char
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """Parse a JSON array incrementally and yield its items one by one.
+
+    Items are yielded as soon as they are complete - the full response
+    does not need to be received or held in memory.
+
+    Args:
+        chunks: raw bytes of the JSON document e.g. response.iter_content()
+
+    Yields:
+        decoded items of the top level array
+
+    Raises:
+        ValueError: if the document is not exactly one valid JSON array
+    """
+    decoder = json.JSONDecoder()
+    stream = _TextStream(chunks)
+    stream.expect("[", "JSON array")
+
+    if stream.peek() == "]":
+        stream.position += 1
+    else:
+        yield stream.decode(decoder)
+        while stream.expect(",]", "',' or ']'") == ",":
+            yield stream.decode(decoder)
+
+    if char := stream.peek():
+        msg = f"Unexpected {char!r} after JSON array"
+        raise ValueError(msg)
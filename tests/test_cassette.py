@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+import requests
+
+from communi_api.cassette import RECORD, Cassette, CassetteMissError
+
+
+class _CountingHandler(BaseHTTPRequestHandler):
+    """Answers every GET with the number of requests received so far."""
+
+    count = 0
+    delay = 0.0
+
+    def do_GET(self) -> None:
+        time.sleep(_CountingHandler.delay)
+        _CountingHandler.count += 1
+        body = json.dumps({"count": _CountingHandler.count}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        """Keep test output quiet."""
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    """Local HTTP server for recording."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_record_and_replay(tmp_path: Path, server_url: str) -> None:
+    """Check that recorded responses are replayed in order without a server."""
+    cassette_file = tmp_path / "cassette.json"
+    with Cassette(cassette_file, mode=RECORD) as cassette:
+        session = requests.Session()
+        cassette.install(session)
+        recorded = [session.get(f"{server_url}/test").json() for _ in range(2)]
+
+    replay = Cassette(cassette_file, latency_scale=0)
+    session = requests.Session()
+    replay.install(session)
+    start = time.monotonic()
+    replayed = [session.get(f"{server_url}/test").json() for _ in range(2)]
+    assert replayed == recorded
+    assert time.monotonic() - start < 1
+
+    with pytest.raises(CassetteMissError):
+        session.get(f"{server_url}/test")
+
+
+def test_replay_latency(tmp_path: Path, server_url: str) -> None:
+    """Check that recorded response times are replayed and scaled."""
+    cassette_file = tmp_path / "cassette.json"
+    _CountingHandler.delay = 0.2
+    try:
+        with Cassette(cassette_file, mode=RECORD) as cassette:
+            session = requests.Session()
+            cassette.install(session)
+            session.get(f"{server_url}/slow")
+    finally:
+        _CountingHandler.delay = 0.0
+    assert cassette.interactions[0]["response"]["elapsed"] >= 0.2  # noqa: PLR2004
+
+    for latency_scale, minimum, maximum in ((1, 0.2, 1), (0.5, 0.1, 0.2)):
+        session = requests.Session()
+        Cassette(cassette_file, latency_scale=latency_scale).install(session)
+        start = time.monotonic()
+        session.get(f"{server_url}/slow")
+        assert minimum <= time.monotonic() - start < maximum
+
+
+def test_activate_replays_new_sessions(tmp_path: Path, server_url: str) -> None:
+    """Check that activate() also covers sessions created later."""
+    cassette_file = tmp_path / "cassette.json"
+    with Cassette(cassette_file, mode=RECORD) as cassette, cassette.activate():
+        recorded = requests.get(f"{server_url}/other", timeout=5).json()
+
+    with Cassette(cassette_file, latency_scale=0).activate():
+        assert requests.get(f"{server_url}/other", timeout=5).json() == recorded
@@ -0,0 +1,80 @@
+from communi_api.churchToolsActions import plan_event_chats
+from communi_api.roster import PersonRegistry
+
+SERVICES = {
+    1: {"name": "Ton", "serviceGroupId": 10},
+    2: {"name": "Predigt", "serviceGroupId": 20},
+    3: {"name": "Lobpreis", "serviceGroupId": 30},
+}
+SERVICE_GROUPS = {
+    10: {"name": "Technik"},
+    20: {"name": "Programm"},
+    30: {"name": "Musik"},
+}
+
+
+class RecordingChurchTools:
+    """ChurchTools client with fixed events which records person lookups."""
+
+    def __init__(self, events: dict[int, list[tuple[int, int]]]) -> None:
+        """Args:
+        events: (service ID, person ID) pairs by event ID
+        """
+        self.events = events
+        self.person_requests = []
+
+    def get_services(self, **_kwargs) -> dict:
+        """Service masterdata by ID."""
+        return SERVICES
+
+    def get_event_masterdata(self, **_kwargs) -> dict:
+        """Service groups by ID."""
+        return SERVICE_GROUPS
+
+    def get_events(self, eventId: int, **_kwargs) -> list[dict]:  # noqa: N803
+        """Single event with services."""
+        return [
+            {
+                "id": eventId,
+                "name": f"Event {eventId}",
+                "startDate": "2026-10-11T08:00:00Z",
+                "eventServices": [
+                    {"serviceId": service_id, "personId": person_id, "agreed": True}
+                    for service_id, person_id in self.events[eventId]
+                ],
+            }
+        ]
+
+    def get_persons(self, ids: list[int]) -> list[dict]:
+        """Persons by ID - every call is recorded."""
+        self.person_requests.append(sorted(ids))
+        return [
+            {
+                "id": person_id,
+                "email": f"user{person_id}@example.com",
+                "firstName": "Test",
+                "lastName": str(person_id),
+            }
+            for person_id in ids
+        ]
+
+
+def test_plan_event_chats_resolves_relevant_events_only() -> None:
+    """Check that persons are only loaded for relevant events - one batch each."""
+    ct_api = RecordingChurchTools(
+        {
+            100: [(1, 7)],
+            101: [(2, 8)],
+            102: [(1, 9), (3, 10), (1, 7)],
+        }
+    )
+    person_cache = PersonRegistry()
+    plans = plan_event_chats(ct_api, [100, 101, 102], person_cache=person_cache)
+
+    assert [plan["event_id"] for plan in plans] == [100, 102]
+    assert ct_api.person_requests == [[7], [9, 10]]
+    assert 8 not in person_cache  # noqa: PLR2004
+
+    plans = plan_event_chats(ct_api, [101], only_relevant=False)
+    assert [plan["event_id"] for plan in plans] == [101]
+    assert ct_api.person_requests[-1] == [8]
@@ -3,13 +3,23 @@ import logging
 import logging.config
 import os
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
 from churchtools_api.churchtools_api import ChurchToolsApi
 
-from communi_api.churchToolsActions import create_event_chats, delete_event_chats
+from communi_api.churchToolsActions import (
+    are_services_relevant,
+    create_event_chats,
+    delete_event_chats,
+    plan_event_chats,
+)
 from communi_api.communi_api import CommuniApi
+from communi_api.multi_app import AppTarget, create_event_chats_for_apps
+from communi_api.rules import SyncRules
+from communi_api.snapshot import OfflineCommuniApi
 
 logger = logging.getLogger(__name__)
 
@@ -143,6 +153,27 @@ class TestsCommuniApp():
         test_id = 7676
         assert result == test_id
 
+    def test_iter_groups(self) -> None:
+        """Check streaming group APIs.
+
+        IMPORTANT - This test method and the parameters used depend on the target system!
+        """
+        result = list(self.api.iter_groups())
+        assert len(result) == len(self.api.getGroups())
+
+        result = self.api.find_group(name="Admins und Moderatoren")["id"]
+        test_id = 7676
+        assert result == test_id
+
+        result = self.api.find_group(title_prefix="Evang. Kirche")["id"]
+        test_id = 7525
+        assert result == test_id
+
+        assert self.api.find_group(name="_not existing group name") is None
+
+        result = list(self.api.iter_user_group_list(group=7525))
+        assert len(result) > 0
+
     def test_createDeleteGroup(self) -> None:
         """Check create/delete Group APIs.
 
@@ -258,6 +289,47 @@ class TestsCommuniApp():
         result = delete_event_chats(self.ct_api, self.api, test_event_ids)
         assert True is result
 
+    def test_create_event_chats_for_apps(self) -> None:
+        """Check syncing one ChurchTools fetch into several apps.
+
+        Uses the same test app twice - the second target does not accept any event.
+        IMPORTANT - This test method and the parameters used depend on the target system!
+        event ID 2626 on elkw1610.krz.tools represents a rest event with multiple services
+        """
+        test_event_ids = [2626]
+        apps = [
+            AppTarget("main", self.api),
+            AppTarget("none", self.api, route=lambda _plan: False),
+        ]
+        result = create_event_chats_for_apps(self.ct_api, apps, test_event_ids)
+        assert result["main"]["success"]
+        assert result["main"]["events"] == {2626: True}
+        assert result["none"]["events"] == {}
+
+        result = delete_event_chats(self.ct_api, self.api, test_event_ids)
+        assert True is result
+
+    def test_plan_event_chats(self) -> None:
+        """Check that planning only resolves relevant events.
+
+        IMPORTANT - This test method and the parameters used depend on the target system!
+        event ID 2626 on elkw1610.krz.tools represents a rest event with multiple services
+        """
+        test_event_ids = [2626]
+        plans = plan_event_chats(self.ct_api, test_event_ids, only_relevant=True)
+        assert len(plans) == 1
+        assert plans[0]["event_id"] == test_event_ids[0]
+        assert plans[0]["group_name"].startswith("_")
+        assert are_services_relevant(plans[0]["services"])
+
+        plans = plan_event_chats(
+            self.ct_api,
+            test_event_ids,
+            only_relevant=True,
+            rules=SyncRules(relevant_service_groups=frozenset()),
+        )
+        assert len(plans) == 0
+
     def test_recommendation(self) -> None:
         """Check recommendation API.
 
@@ -283,3 +355,103 @@ class TestsCommuniApp():
 
         result = self.api.deleteGroup(id=group_id)
         assert result
+
+    def test_publish_recommendations(self) -> None:
+        """Check bulk recommendation publishing.
+
+        Posts two items into two new test groups - the second call
+        is expected to skip all pairs which were already published.
+        """
+        group_ids = [
+            self.api.createGroup(
+                f"_test_publish_recommendations{i} ",
+                "If this group exists some test failed - please delete",
+            )["id"]
+            for i in range(2)
+        ]
+
+        timestamp = datetime.now(tz=timezone.utc)
+        items = [
+            {
+                "title": f"test_title{i}",
+                "description": "test description",
+                "post_date": timestamp,
+                "link": f"https://github.com/bensteUEM/CommuniAPI/?item={i}",
+            }
+            for i in range(2)
+        ]
+        result = self.api.publish_recommendations(items, group_ids)
+        assert len(result) == 4
+        assert all(row["status"] == "posted" for row in result)
+
+        result = self.api.publish_recommendations(items, group_ids)
+        assert all(row["status"] == "skipped" for row in result)
+
+        for group_id in group_ids:
+            assert self.api.deleteGroup(id=group_id)
+
+    def test_snapshot(self, tmp_path: Path) -> None:
+        """Check snapshot export and offline access.
+
+        IMPORTANT - This test method and the parameters used depend on the target system!
+        userId = 28057 => Admin, groupId 7525 => Evang. Kirche Baiersbronn
+        """
+        snapshot_file = tmp_path / "snapshot.jsonl.gz"
+        counts = self.api.export_snapshot(snapshot_file)
+        assert counts["group"] > 0
+
+        offline_api = OfflineCommuniApi(snapshot_file)
+        assert offline_api.communi_appid == self.api.communi_appid
+        assert len(offline_api.getGroups()) == counts["group"]
+        assert offline_api.getGroups(id=7525)["title"] == "Evang. Kirche Baiersbronn"
+        assert offline_api.getUserList(userId=28057)["id"] == 28057
+        assert len(offline_api.getUserGroupList(user=28057)) > 0
+        assert not offline_api.createGroup("Test1", "not created offline")
+
+    def test_lazy_login(self, tmp_path: Path) -> None:
+        """Check postponed login and reuse of a cached login."""
+        session_cache = tmp_path / "session_cache.json"
+        api = CommuniApi(
+            self.COMMUNI_SERVER,
+            self.COMMUNI_TOKEN,
+            self.COMMUNI_APPID,
+            lazy_login=True,
+            session_cache=session_cache,
+        )
+        assert not hasattr(api, "user_id")
+        assert not session_cache.exists()
+
+        result = api.who_am_i()
+        assert result.get("id")
+        assert session_cache.exists()
+
+        cached_api = CommuniApi(
+            self.COMMUNI_SERVER,
+            self.COMMUNI_TOKEN,
+            self.COMMUNI_APPID,
+            session_cache=session_cache,
+        )
+        assert cached_api.user_id == api.user_id
+
+    def test_thread_safe(self) -> None:
+        """Check concurrent use of a thread safe instance.
+
+        IMPORTANT - This test method and the parameters used depend on the target system!
+        """
+        api = CommuniApi(
+            self.COMMUNI_SERVER,
+            self.COMMUNI_TOKEN,
+            self.COMMUNI_APPID,
+            lazy_login=True,
+            thread_safe=True,
+            pool_size=4,
+        )
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: api.getGroups(id=7525), range(8)))
+        assert all(
+            result["title"] == "Evang. Kirche Baiersbronn" for result in results
+        )
+
+        with pytest.raises(AttributeError):
+            api.communi_appid = 9999
+        api.close()
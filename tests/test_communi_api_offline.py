@@ -0,0 +1,142 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from communi_api.communi_api import CommuniApi
+from communi_api.loadtest import CommuniStandIn
+
+
+def test_publish_recommendations() -> None:
+    """Check that a default client publishes concurrently through a thread safe copy."""
+    with CommuniStandIn() as server:
+        communi_api = CommuniApi(server.url, "token-1", 1)
+        items = [
+            {
+                "title": "_pytest",
+                "description": "recommendation",
+                "post_date": datetime.now(tz=timezone.utc),
+                "link": f"https://example.com/{index}",
+            }
+            for index in range(3)
+        ]
+        groups = [
+            communi_api.createGroup(f"_pytest {index}")["id"] for index in range(2)
+        ]
+        result = communi_api.publish_recommendations(items, groups, max_workers=4)
+
+        assert [row["status"] for row in result] == ["posted"] * 6
+        assert len(communi_api._sessions) == 1  # noqa: SLF001
+        communi_api.close()
+
+
+def test_publish_recommendations_published_file(tmp_path: Path) -> None:
+    """Check that pairs posted by an earlier instance are skipped."""
+    published_file = tmp_path / "published.json"
+    item = {
+        "title": "_pytest",
+        "description": "recommendation",
+        "post_date": datetime.now(tz=timezone.utc),
+        "link": "https://example.com/weekly",
+    }
+    with CommuniStandIn() as server:
+        first = CommuniApi(server.url, "token-1", 1)
+        group_id = first.createGroup("_pytest")["id"]
+        result = first.publish_recommendations(
+            [item], [group_id], published_file=published_file
+        )
+        assert result[0]["status"] == "posted"
+
+        second = CommuniApi(server.url, "token-1", 1)
+        result = second.publish_recommendations(
+            [item], [group_id], published_file=published_file
+        )
+        assert result[0]["status"] == "skipped"
+        assert list(tmp_path.iterdir()) == [published_file]
+        first.close()
+        second.close()
+
+
+def test_thread_safe_sessions_are_released() -> None:
+    """Check that sessions of finished worker threads do not accumulate."""
+    with CommuniStandIn() as server:
+        communi_api = CommuniApi(server.url, "token-1", 1, thread_safe=True)
+        group_id = communi_api.createGroup("_pytest")["id"]
+        for index in range(5):
+            item = {
+                "title": "_pytest",
+                "description": "recommendation",
+                "post_date": datetime.now(tz=timezone.utc),
+                "link": f"https://example.com/{index}",
+            }
+            result = communi_api.publish_recommendations(
+                [item], [group_id], max_workers=2
+            )
+            assert result[0]["status"] == "posted"
+            assert len(communi_api._sessions) == 1  # noqa: SLF001
+        communi_api.close()
+
+
+def test_session_cache(tmp_path: Path) -> None:
+    """Check that a cached login is reused without contacting the server."""
+    session_cache = tmp_path / "session_cache.json"
+    with CommuniStandIn() as server:
+        url = server.url
+        api = CommuniApi(
+            url, "token-1", 1, lazy_login=True, session_cache=session_cache
+        )
+        assert not session_cache.exists()
+        assert api.who_am_i()["id"] == 1
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda index: CommuniApi(
+                        url, f"token-{index}", 1, session_cache=session_cache
+                    ).user_id,
+                    range(8),
+                )
+            )
+        assert results == [1] * 8
+
+    assert json.loads(session_cache.read_text())
+    assert list(tmp_path.iterdir()) == [session_cache]
+    # the server is stopped - only the cache can provide the login
+    cached_api = CommuniApi(url, "token-1", 1, session_cache=session_cache)
+    assert cached_api.user_id == 1
+
+
+def test_session_cache_not_writable(tmp_path: Path) -> None:
+    """Check that a session cache which can not be written does not fail the login."""
+    session_cache = tmp_path / "missing" / "session_cache.json"
+    with CommuniStandIn() as server:
+        api = CommuniApi(server.url, "token-1", 1, session_cache=session_cache)
+        assert api.user_id == 1
+    assert not session_cache.parent.exists()
+
+
+def test_lazy_login_concurrent_and_retried() -> None:
+    """Check that threads wait for a running login and a failed login is retried."""
+    with CommuniStandIn(latency=0.1) as server:
+        api = CommuniApi(
+            server.url, "token-1", 1, lazy_login=True, thread_safe=True, pool_size=4
+        )
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: api.who_am_i(), range(4)))
+        assert all(result["id"] == 1 for result in results)
+        api.close()
+
+        api = CommuniApi(
+            server.url,
+            "token-1",
+            1,
+            lazy_login=True,
+            failure_threshold=1,
+            reset_timeout=0.2,
+        )
+        api.circuit_breaker("login").record_failure()
+        assert api.who_am_i() is False
+        time.sleep(0.2)
+        assert api.who_am_i()["id"] == 1
+        api.close()
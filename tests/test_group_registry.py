@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+
+from communi_api.communiActions import get_create_or_delete_group
+from communi_api.group_registry import GroupRegistry
+
+
+class RecordingCommuni:
+    """Minimal Communi client which keeps groups in memory."""
+
+    def __init__(self) -> None:
+        """Start without groups."""
+        self.groups = {}
+        self.calls = []
+        self.next_id = 0
+
+    def find_group(self, **kwargs) -> dict | None:
+        """Find a group by id or title prefix."""
+        self.calls.append("find_group")
+        if "id" in kwargs:
+            return self.groups.get(kwargs["id"])
+        return next(
+            (
+                group
+                for group in self.groups.values()
+                if group["title"].startswith(kwargs["title_prefix"])
+            ),
+            None,
+        )
+
+    def createGroup(self, title: str, *_args) -> dict:  # noqa: N802
+        """Create a group with the next ID."""
+        self.calls.append("createGroup")
+        self.next_id += 1
+        group = {"id": self.next_id, "title": title}
+        self.groups[group["id"]] = group
+        return group
+
+    def deleteGroup(self, id: int) -> bool:  # noqa: A002, N802
+        """Delete a group by ID."""
+        self.calls.append("deleteGroup")
+        self.groups.pop(id, None)
+        return True
+
+
+def test_group_registry_persistence(tmp_path) -> None:  # noqa: ANN001
+    """Check lookups and that records survive a reload."""
+    path = tmp_path / "groups.json"
+    expires = datetime(2026, 1, 4, tzinfo=timezone.utc)
+    registry = GroupRegistry(path)
+    record = registry.register(1, 100, "_Sun 01.01 (10:00) - Gottesdienst", expires)
+    registry.register(2, 101, "_Mon 02.01 (10:00) - Probe")
+
+    loaded = GroupRegistry(path)
+    assert loaded.by_event(100) == record
+    assert loaded.by_group(2).event_id == 101  # noqa: PLR2004
+    assert loaded.expired(expires) == [record]
+    assert loaded.expired(expires - timedelta(seconds=1)) == []
+
+    loaded.register(3, 100, "_Sun 01.01 (10:00) - Gottesdienst")
+    assert loaded.by_group(1) is None
+    assert len(loaded) == 2  # noqa: PLR2004
+
+
+def test_get_create_or_delete_group_with_registry() -> None:
+    """Check that registered groups are used and swept without name lookups."""
+    communi_api = RecordingCommuni()
+    registry = GroupRegistry()
+    expires = datetime(2026, 1, 4, tzinfo=timezone.utc)
+
+    group_id = get_create_or_delete_group(
+        communi_api, "_group", registry=registry, event_id=100, expires=expires
+    )
+    assert communi_api.calls == ["find_group", "createGroup"]
+    assert registry.by_event(100).group_id == group_id
+
+    communi_api.calls.clear()
+    assert (
+        get_create_or_delete_group(
+            communi_api, "_group", registry=registry, event_id=100, expires=expires
+        )
+        == group_id
+    )
+    assert communi_api.calls == ["find_group"]
+
+    communi_api.calls.clear()
+    assert registry.sweep(communi_api, now=expires - timedelta(days=1)) == {}
+    assert registry.sweep(communi_api, now=expires) == {group_id: True}
+    assert communi_api.calls == ["deleteGroup"]
+    assert communi_api.groups == {}
+    assert len(registry) == 0
+
+
+def test_get_create_or_delete_group_drops_missing_group() -> None:
+    """Check that a registered group deleted in Communi is replaced."""
+    communi_api = RecordingCommuni()
+    registry = GroupRegistry()
+    group_id = get_create_or_delete_group(
+        communi_api, "_group", registry=registry, event_id=100
+    )
+    communi_api.deleteGroup(id=group_id)
+
+    new_group_id = get_create_or_delete_group(
+        communi_api, "_group", registry=registry, event_id=100
+    )
+    assert new_group_id != group_id
+    assert registry.by_event(100).group_id == new_group_id
+    assert registry.by_group(group_id) is None
+
+
+def test_get_create_or_delete_group_failed_delete() -> None:
+    """Check that a failed delete is reported and stale records are dropped."""
+    communi_api = RecordingCommuni()
+    registry = GroupRegistry()
+    group_id = get_create_or_delete_group(
+        communi_api, "_group", registry=registry, event_id=100
+    )
+    communi_api.deleteGroup = lambda **_kwargs: False
+
+    assert (
+        get_create_or_delete_group(
+            communi_api, "_group", delete=True, registry=registry, event_id=100
+        )
+        is None
+    )
+    assert registry.by_event(100).group_id == group_id
+
+    communi_api.groups.clear()
+    assert (
+        get_create_or_delete_group(
+            communi_api, "_group", delete=True, registry=registry, event_id=100
+        )
+        is None
+    )
+    assert len(registry) == 0
+
+
+def test_group_registry_save_failure(tmp_path) -> None:  # noqa: ANN001
+    """Check that a registry file which can not be written keeps working in memory."""
+    registry = GroupRegistry(tmp_path / "missing" / "groups.json")
+    record = registry.register(1, 100, "_group")
+    assert registry.by_event(100) == record
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,34 @@
+from communi_api.communi_api import CommuniApi
+from communi_api.loadtest import CommuniStandIn, run_load_test
+
+
+def test_stand_in_tenants() -> None:
+    """Check that tenants of the stand-in are separated."""
+    with CommuniStandIn() as server:
+        tenant1 = CommuniApi(server.url, "token-1", 1)
+        tenant2 = CommuniApi(server.url, "token-2", 2)
+        assert tenant1.login()
+
+        group = tenant1.createGroup("_pytest group")
+        assert tenant1.changeUserGroup(2, group["id"])
+        assert group["id"] in [item["id"] for item in tenant1.getGroups()]
+        assert tenant2.find_group(id=group["id"]) is None
+
+        members = [item["user"] for item in tenant1.getUserGroupList(group=group["id"])]
+        assert members == [1, 2]
+        tenant1.close()
+        tenant2.close()
+
+
+def test_run_load_test() -> None:
+    """Check that all metrics are reported per concurrency level."""
+    results = run_load_test([1, 3], operations=20, error_rate=0.1)
+
+    assert [result["tenants"] for result in results] == [1, 3]
+    assert [result["operations"] for result in results] == [20, 60]
+    for result in results:
+        assert result["throughput"] > 0
+        assert result["p50"] <= result["p95"] <= result["p99"]
+        assert result["error_rate"] < 0.5  # noqa: PLR2004
+        assert result["memory_per_client_kib"] > 0
+    assert any(result["error_rate"] > 0 for result in results)
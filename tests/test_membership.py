@@ -0,0 +1,92 @@
+from communi_api.churchToolsActions import update_group_users_by_services
+from communi_api.membership import MembershipGraph
+
+USER_GROUP_LIST = [
+    {"user": 1, "group": 10, "status": 2},
+    {"user": 2, "group": 10, "status": 2},
+    {"user": 3, "group": 10, "status": 4},
+    {"user": 2, "group": 20, "status": 2},
+    {"user": 4, "group": 20, "status": 2},
+]
+
+
+def test_membership_graph_queries() -> None:
+    """Check single group and cross group queries."""
+    graph = MembershipGraph.from_user_group_list(USER_GROUP_LIST)
+
+    assert graph.members(10) == {1, 2, 3}
+    assert graph.count(20) == 2
+    assert graph.is_member(4, 20)
+    assert not graph.is_member(4, 10)
+    assert not graph.is_member(99, 10)
+    assert graph.groups_of(2) == {10, 20}
+    assert graph.users_in_any([10, 20]) == {1, 2, 3, 4}
+    assert graph.users_in_all([10, 20]) == {2}
+    assert graph.difference(10, 20) == {1, 3}
+
+
+def test_membership_graph_statuses() -> None:
+    """Check that allocations can be filtered by status."""
+    graph = MembershipGraph.from_user_group_list(USER_GROUP_LIST, statuses=[2])
+    assert graph.members(10) == {1, 2}
+    assert not MembershipGraph.from_user_group_list(user_group_list=False).group_ids
+
+
+def test_membership_graph_reconcile() -> None:
+    """Check desired vs. actual comparison for several groups."""
+    graph = MembershipGraph.from_user_group_list(USER_GROUP_LIST, statuses=[2])
+
+    result = graph.reconcile({10: [1, 5], 20: [2, 4], 30: [1]})
+    assert result[10] == ({5}, {2})
+    assert result[20] == (set(), set())
+    assert result[30] == ({1}, set())
+
+    graph.add(5, 10)
+    graph.remove(2, 10)
+    assert graph.diff(10, [1, 5]) == (set(), set())
+
+
+class NewGroupCommuni:
+    """Minimal Communi client with a new group which only contains its owner."""
+
+    def __init__(self) -> None:
+        """Start without changes."""
+        self.added = []
+        self.messages = []
+
+    def getUserList(self) -> list[dict]:  # noqa: N802
+        """Owner and one other user."""
+        return [
+            {"id": 1, "mailadresse": "owner@example.com"},
+            {"id": 99, "mailadresse": "a@example.com"},
+        ]
+
+    def getUserGroupList(self, group: int) -> list[dict]:  # noqa: N802
+        """Owner membership of the new group."""
+        return [{"user": 1, "group": group, "status": 2}]
+
+    def changeUserGroup(self, userId: int, *_args) -> bool:  # noqa: N802, N803
+        """Remember added users."""
+        self.added.append(userId)
+        return True
+
+    def message(self, groupId: int, text: str) -> bool:  # noqa: ARG002, N803
+        """Remember messages."""
+        self.messages.append(text)
+        return True
+
+
+def test_update_group_users_adds_person_once() -> None:
+    """Check that a person with two services is added once to a new group."""
+    communi_api = NewGroupCommuni()
+    services = {
+        "Technik": {
+            "Ton": [("a@example.com", " A B")],
+            "Licht": [("a@example.com", " A B")],
+        }
+    }
+    update_group_users_by_services(communi_api, services, 10)
+
+    assert communi_api.added == [99]
+    assert "Erstbefüllung" in communi_api.messages[0]
+    assert communi_api.messages[1] == "Technik:\nTon\n•  A B"
@@ -0,0 +1,60 @@
+from communi_api.communi_api import CommuniApi
+from communi_api.loadtest import CommuniStandIn
+from communi_api.multi_app import AppTarget, create_event_chats_for_apps
+from communi_api.rules import SyncRules
+from tests.test_church_tools_actions import RecordingChurchTools
+
+
+class BrokenCommuni:
+    """Communi client of an app whose backend fails on every lookup."""
+
+    def find_group(self, **_kwargs) -> dict:
+        """Fail like an unexpected client error."""
+        msg = "backend down"
+        raise RuntimeError(msg)
+
+
+def test_create_event_chats_for_apps_offline() -> None:
+    """Check routing by per-app rules and isolation of a failing app."""
+    ct_api = RecordingChurchTools(
+        {
+            100: [(1, 7)],
+            101: [(2, 8)],
+            102: [(1, 9), (3, 10)],
+            103: [(3, 11)],
+        }
+    )
+    with CommuniStandIn() as server:
+        technik = CommuniApi(server.url, "token-1", 1)
+        musik = CommuniApi(server.url, "token-2", 2)
+        musik_rules = SyncRules(relevant_service_groups=frozenset({"Musik"}))
+        apps = [
+            AppTarget("technik", technik),
+            AppTarget("musik", musik, musik_rules),
+            AppTarget("broken", BrokenCommuni()),
+        ]
+        results = create_event_chats_for_apps(ct_api, apps, [100, 101, 102, 103])
+
+        assert results["technik"]["events"] == {100: True, 102: True}
+        assert results["musik"]["events"] == {102: True, 103: True}
+        assert results["technik"]["success"] is results["musik"]["success"] is True
+        assert results["broken"]["success"] is False
+        assert results["broken"]["error"] == "backend down"
+
+        events = {
+            name: sorted(
+                group["title"].split(" - ")[-1]
+                for group in api.iter_groups()
+                if group["title"].startswith("_")
+            )
+            for name, api in (("technik", technik), ("musik", musik))
+        }
+        assert events == {
+            "technik": ["Event 100", "Event 102"],
+            "musik": ["Event 102", "Event 103"],
+        }
+        technik.close()
+        musik.close()
+
+    # events, masterdata and persons are fetched once for all apps
+    assert ct_api.person_requests == [[7], [9, 10], [11]]
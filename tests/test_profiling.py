@@ -0,0 +1,36 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from communi_api.profiling import PROFILE_ENV_VAR, profile_run, span
+
+
+def test_profile_run(tmp_path: Path) -> None:
+    """Check that spans are saved as Chrome trace."""
+    trace_file = tmp_path / "trace.json"
+    with profile_run(trace_file, use_cprofile=True) as profiler:
+        assert profiler is not None
+        with span("outer", event_id=1), span("inner", "communi"):
+            pass
+
+    trace = json.loads(trace_file.read_text(encoding="utf-8"))
+    names = {event["name"]: event for event in trace["traceEvents"]}
+    assert set(names) == {"run", "outer", "inner"}
+    assert names["inner"]["cat"] == "communi"
+    assert names["outer"]["args"] == {"event_id": 1}
+    assert trace_file.with_suffix(".prof").exists()
+
+
+def test_profile_run_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Check that profiling is toggled by environment variable only."""
+    with profile_run() as profiler:
+        assert profiler is None
+        with span("ignored"):
+            pass
+
+    trace_file = tmp_path / "trace.json"
+    monkeypatch.setenv(PROFILE_ENV_VAR, str(trace_file))
+    with profile_run() as profiler:
+        assert profiler is not None
+    assert trace_file.exists()
@@ -0,0 +1,47 @@
+import multiprocessing
+import time
+
+from communi_api.rate_limiter import RateLimiter
+
+
+def test_rate_limiter_spacing() -> None:
+    """Check that consecutive calls are spaced by the configured interval."""
+    limiter = RateLimiter(requests_per_second=20)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    duration = time.monotonic() - start
+    expected_minimum = 4 * 0.05
+    assert duration >= expected_minimum * 0.9
+
+
+def test_rate_limiter_disabled() -> None:
+    """Check that a rate of 0 does not delay calls."""
+    limiter = RateLimiter(requests_per_second=0)
+    start = time.monotonic()
+    for _ in range(100):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+
+def _acquire_shared(rate_limiter: RateLimiter) -> None:
+    """Acquire a shared limiter from within a worker process."""
+    for _ in range(3):
+        rate_limiter.acquire()
+
+
+def test_rate_limiter_shared() -> None:
+    """Check that a shared limiter spaces calls of several processes."""
+    limiter = RateLimiter(requests_per_second=20, shared=True)
+    start = time.monotonic()
+    workers = [
+        multiprocessing.Process(target=_acquire_shared, args=(limiter,))
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    duration = time.monotonic() - start
+    expected_minimum = 5 * 0.05
+    assert duration >= expected_minimum * 0.9
@@ -0,0 +1,50 @@
+import pickle
+
+from communi_api.roster import EventRoster, PersonRegistry
+
+
+def test_person_registry() -> None:
+    """Check that persons are interned and updated in place."""
+    registry = PersonRegistry()
+    person = registry.add(
+        {"id": 1, "email": "a@example.com", "firstName": "A", "lastName": "B"}
+    )
+    assert registry.missing([1, 2, None]) == {2}
+
+    updated = registry.add(
+        {"id": 1, "email": "c@example.com", "firstName": "A", "lastName": "B"}
+    )
+    assert updated is person
+    assert person.email == "c@example.com"
+    assert len(registry) == 1
+
+
+def test_event_roster() -> None:
+    """Check dict compatibility and shared persons of rosters."""
+    registry = PersonRegistry()
+    person = registry.add(
+        {"id": 1, "email": "a@example.com", "firstName": "A", "lastName": "B"}
+    )
+    rosters = []
+    for event_id in (10, 11):
+        roster = EventRoster(event_id, ["Technik", "Programm", "Musik"])
+        roster.add("Technik", "Ton", person, agreed=event_id == 10)  # noqa: PLR2004
+        roster.add("Programm", "Predigt")
+        rosters.append(roster)
+
+    assert rosters[0].to_dict() == {
+        "Technik": {"Ton": [("a@example.com", " A B")]},
+        "Programm": {"Predigt": []},
+        "Musik": {},
+    }
+    assert rosters[1]["Technik"] == {"Ton": [("a@example.com", "? A B")]}
+    assert rosters[0] == rosters[0].to_dict()
+
+    assert rosters[0].persons() == rosters[1].persons() == {person}
+    assignments = [assignment for *_names, assignment in rosters[1].assignments()]
+    assert assignments[0].person is person
+
+    person.last_name = "C"
+    assert rosters[0]["Technik"]["Ton"] == [("a@example.com", " A C")]
+
+    assert pickle.loads(pickle.dumps(rosters[1])) == rosters[1].to_dict()  # noqa: S301
@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+from communi_api.rules import DEFAULT_RULES, SyncRules
+
+SERVICE_NAMES = {
+    1: {"name": "Ton", "serviceGroupId": 10},
+    2: {"name": "Predigt", "serviceGroupId": 20},
+    3: {"name": "Opfer zählen", "serviceGroupId": 30},
+    4: {"name": "Moderation", "serviceGroupId": 20},
+}
+SERVICE_GROUPS = {
+    10: {"name": "Technik"},
+    20: {"name": "Programm"},
+    30: {"name": "Begrüßung"},
+}
+
+
+def test_default_rules() -> None:
+    """Check that defaults match the original hardcoded behaviour."""
+    assert DEFAULT_RULES.is_relevant({"Technik": {"Ton": []}, "Programm": {}})
+    assert not DEFAULT_RULES.is_relevant({"Technik": {}, "Programm": {"Predigt": []}})
+    assert DEFAULT_RULES.is_excluded("Opfer zählen", "Begrüßung")
+    assert not DEFAULT_RULES.is_excluded("Predigt", "Programm")
+    assert DEFAULT_RULES.role_for("Predigt") == DEFAULT_RULES.default_role
+
+
+def test_rules_from_json(tmp_path: Path) -> None:
+    """Check loading of a rules config file."""
+    config_file = tmp_path / "rules.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "relevant_service_groups": [],
+                "relevant_services": ["Predigt"],
+                "excluded_service_groups": ["Technik"],
+                "service_roles": {"Moderation": 30},
+            }
+        ),
+        encoding="utf-8",
+    )
+    rules = SyncRules.from_json(config_file)
+
+    assert rules.is_relevant({"Programm": {"Predigt": []}})
+    assert not rules.is_relevant({"Technik": {"Ton": []}})
+    assert rules.is_excluded("Ton", "Technik")
+    assert rules.is_excluded("Opfer zählen", "Begrüßung")
+    expected_role = 30
+    assert rules.role_for("Moderation") == expected_role
+
+
+def test_compiled_rules() -> None:
+    """Check ID based relevance resolved from masterdata."""
+    compiled = SyncRules(relevant_services=frozenset({"Moderation"})).compile(
+        SERVICE_NAMES, SERVICE_GROUPS
+    )
+
+    assert compiled.relevant_service_ids == {1, 4}
+
+    assert compiled.is_event_relevant({"eventServices": [{"serviceId": 1}]})
+    assert not compiled.is_event_relevant({"eventServices": [{"serviceId": 2}]})
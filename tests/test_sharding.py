@@ -0,0 +1,40 @@
+from communi_api import sharding
+from communi_api.sharding import shard_events_by_date
+
+
+def test_shard_events_by_date() -> None:
+    """Check that shards are balanced and cover continuous date ranges."""
+    events = [
+        {"id": event_id, "startDate": f"2026-10-{day:02d}T10:00:00Z"}
+        for event_id, day in [(5, 5), (1, 1), (3, 3), (2, 2), (4, 4)]
+    ]
+    assert shard_events_by_date(events, 2) == [[1, 2, 3], [4, 5]]
+    assert shard_events_by_date(events, 10) == [[1], [2], [3], [4], [5]]
+    assert shard_events_by_date([], 4) == []
+
+
+def _failing_shard(_connection: dict, event_ids: list[int], *_args: object) -> dict:
+    """Replacement for _run_shard which fails for the shard containing event 1."""
+    if 1 in event_ids:
+        msg = "ChurchTools not reachable"
+        raise ConnectionError(msg)
+    return {
+        "events": dict.fromkeys(event_ids, True),
+        "metrics": {"planned": len(event_ids), "failed": 0, "duration": 0.0},
+    }
+
+
+def test_create_event_chats_sharded_keeps_other_shards(monkeypatch) -> None:  # noqa: ANN001
+    """Check that one failing shard does not discard the results of the others."""
+    monkeypatch.setattr(sharding, "_run_shard", _failing_shard)
+    events = [
+        {"id": event_id, "startDate": f"2026-10-{event_id:02d}T10:00:00Z"}
+        for event_id in range(1, 5)
+    ]
+    result = sharding.create_event_chats_sharded({}, events, processes=2)
+
+    assert result["events"] == {1: False, 2: False, 3: True, 4: True}
+    assert result["errors"] == {0: "ChurchTools not reachable"}
+    assert result["metrics"]["failed"] == 2  # noqa: PLR2004
+    assert result["metrics"]["planned"] == 2  # noqa: PLR2004
+    assert not result["success"]
@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+from communi_api.churchToolsActions import create_event_chats
+from communi_api.snapshot import SNAPSHOT_FORMAT_VERSION, OfflineCommuniApi
+
+
+class StaticChurchTools:
+    """Minimal ChurchTools client with one event and one technician."""
+
+    def get_services(self, **_kwargs) -> dict:
+        """Service masterdata by ID."""
+        return {1: {"name": "Ton", "serviceGroupId": 10}}
+
+    def get_event_masterdata(self, **_kwargs) -> dict:
+        """Service groups by ID."""
+        return {10: {"name": "Technik"}}
+
+    def get_events(self, eventId: int, **_kwargs) -> list[dict]:  # noqa: N803
+        """Single event with services."""
+        return [
+            {
+                "id": eventId,
+                "name": "Gottesdienst",
+                "startDate": "2026-10-11T08:00:00Z",
+                "eventServices": [{"serviceId": 1, "personId": 7, "agreed": True}],
+            }
+        ]
+
+    def get_persons(self, ids: list[int]) -> list[dict]:
+        """Persons by ID."""
+        return [
+            {
+                "id": person_id,
+                "email": "a@example.com",
+                "firstName": "A",
+                "lastName": "B",
+            }
+            for person_id in ids
+        ]
+
+
+def test_create_event_chats_offline(tmp_path: Path) -> None:
+    """Check that a dry-run against a snapshot runs without changing anything."""
+    path = tmp_path / "snapshot.jsonl"
+    records = [
+        {"format": SNAPSHOT_FORMAT_VERSION, "communiApp": 1, "created": "now"},
+        {"type": "group", "data": {"id": 1, "title": "Allgemein"}},
+    ]
+    path.write_text("\n".join(json.dumps(record) for record in records) + "\n")
+    communi_api = OfflineCommuniApi(path)
+
+    assert communi_api.is_available()
+    assert create_event_chats(StaticChurchTools(), communi_api, [100]) is True
+    assert communi_api.getGroups(id=1)["title"] == "Allgemein"
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from communi_api.streaming import iter_json_array
+
+GROUPS = [
+    {"id": group_id, "title": f"Grüße {group_id}", "tags": ["]", {"x": ","}]}
+    for group_id in range(20)
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 100000])
+def test_iter_json_array_chunks(chunk_size: int) -> None:
+    """Check that items are decoded correctly independent of chunk borders."""
+    raw = json.dumps([*GROUPS, 12345, None], ensure_ascii=False).encode()
+    chunks = [raw[i : i + chunk_size] for i in range(0, len(raw), chunk_size)]
+    assert list(iter_json_array(chunks)) == [*GROUPS, 12345, None]
+
+
+def test_iter_json_array_lazy() -> None:
+    """Check that the first item is available before the stream is read."""
+    consumed = []
+
+    def chunks():  # noqa: ANN202
+        for chunk in [b'[{"id": 1}', b', {"id": 2}', b"]"]:
+            consumed.append(chunk)
+            yield chunk
+
+    items = iter_json_array(chunks())
+    assert next(items) == {"id": 1}
+    assert len(consumed) == 1
+
+
+@pytest.mark.parametrize(
+    ("chunks", "expected"),
+    [
+        ([b"[1.", b"5e", b"3]"], [1500.0]),
+        ([b"[1", b"2, tr", b"ue, nu", b"ll]"], [12, True, None]),
+        ([b"[-", b"0.5 ,", b"2]"], [-0.5, 2]),
+    ],
+)
+def test_iter_json_array_split_scalars(chunks: list[bytes], expected: list) -> None:
+    """Check that numbers and literals split across chunks are read completely."""
+    assert list(iter_json_array(chunks)) == expected
+
+
+def test_iter_json_array_invalid() -> None:
+    """Check errors for documents which are no complete arrays."""
+    assert list(iter_json_array([b" [ ] "])) == []
+    with pytest.raises(ValueError, match="Expected JSON array"):
+        list(iter_json_array([b'{"id": 1}']))
+    with pytest.raises(ValueError, match="Expected JSON array"):
+        list(iter_json_array([]))
+    with pytest.raises(ValueError, match="not terminated"):
+        list(iter_json_array([b'[{"id": 1}, {"id"']))
+    with pytest.raises(ValueError, match="not terminated"):
+        list(iter_json_array([b"[1"]))
+    with pytest.raises(ValueError, match=r"Invalid JSON value '1\.'"):
+        list(iter_json_array([b"[1."]))
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [b"[1 2 3]", b"[,,1,,]", b"[1,]", b"[1]garbage", b"[1x]", b"[truex]"],
+)
+def test_iter_json_array_malformed(raw: bytes) -> None:
+    """Check that items must be separated by exactly one comma."""
+    for chunk_size in (1, len(raw)):
+        chunks = [raw[i : i + chunk_size] for i in range(0, len(raw), chunk_size)]
+        with pytest.raises(ValueError, match=r"Expected|Unexpected|Invalid"):
+            list(iter_json_array(chunks))